@@ -0,0 +1,33 @@
+"""
+Helpers shared by the benchmark scripts
+"""
+import asyncio
+import time
+
+from aiohttp import web
+
+
+
+
+# Function to serve an aiohttp app on a free local port, returns (runner, base_url)
+async def serve(app):
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+
+
+# Function to track the longest gap between event loop ticks
+async def watch_loop(stop, interval=0.005):
+
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
@@ -0,0 +1,195 @@
+"""
+Check and benchmark for the shared HTTP client against a local stub server
+
+Serves fixed responses from a local aiohttp server and runs HTTPClient through its
+caching rules (max-age, ETag revalidation, Vary, Authorization, disk eviction, error
+statuses), then fires a burst of concurrent requests to report requests/sec, the peak
+concurrency the server saw and the worst event loop stall.
+
+    python -m benchmarks.http_client --requests 2000 --host-limit 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import serve, watch_loop  # noqa: E402
+from utils.http_client import HTTPClient, HTTPStatusError  # noqa: E402
+
+
+BODY = b'x' * 4096
+
+
+
+
+class StubServer:
+    """Local server counting the requests it receives on each route"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.hits = {}
+        self.active = 0
+        self.peak = 0
+
+    def _count(self, request):
+        route = request.match_info.route.resource.canonical
+        self.hits[route] = self.hits.get(route, 0) + 1
+
+    async def fresh(self, request):
+        self._count(request)
+        return web.Response(body=BODY, headers={'Cache-Control': 'max-age=60'})
+
+    async def etag(self, request):
+        self._count(request)
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304, headers={'ETag': '"v1"', 'Cache-Control': 'no-cache'})
+        return web.Response(body=BODY, headers={'ETag': '"v1"', 'Cache-Control': 'no-cache'})
+
+    async def vary(self, request):
+        self._count(request)
+        language = request.headers.get('X-Language', 'en')
+        return web.Response(text=language, headers={'Cache-Control': 'max-age=60', 'Vary': 'X-Language'})
+
+    async def private(self, request):
+        self._count(request)
+        return web.Response(text=request.headers.get('Authorization', ''), headers={'Cache-Control': 'max-age=60'})
+
+    async def missing(self, request):
+        self._count(request)
+        return web.Response(status=404)
+
+    async def sized(self, request):
+        self._count(request)
+        return web.Response(body=BODY, headers={'Cache-Control': 'max-age=60'})
+
+    async def slow(self, request):
+        self._count(request)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return web.Response(body=BODY)
+
+
+
+
+# Function to serve the stub routes on a local port, returns (runner, base_url)
+async def serve_stub(server):
+
+    app = web.Application()
+    app.router.add_get('/fresh', server.fresh)
+    app.router.add_get('/etag', server.etag)
+    app.router.add_get('/vary', server.vary)
+    app.router.add_get('/private', server.private)
+    app.router.add_get('/missing', server.missing)
+    app.router.add_get('/sized/{n}', server.sized)
+    app.router.add_get('/slow/{n}', server.slow)
+    return await serve(app)
+
+
+
+
+# Function to run the caching checks, returns a list of (name, passed) results
+async def check(server, base_url, cache_dir):
+
+    results = []
+    client = HTTPClient(cache_dir=cache_dir, disk_bytes=10 * len(BODY))
+    await client.start()
+    try:
+        first = await client.get(f"{base_url}/fresh")
+        second = await client.get(f"{base_url}/fresh")
+        results.append(("max-age served from cache", not first.from_cache and second.from_cache and server.hits['/fresh'] == 1))
+
+        await client.get(f"{base_url}/etag")
+        revalidated = await client.get(f"{base_url}/etag")
+        results.append(("ETag revalidated with 304", revalidated.from_cache and revalidated.body == BODY and server.hits['/etag'] == 2))
+
+        english = await client.get(f"{base_url}/vary", headers={'X-Language': 'en'})
+        french = await client.get(f"{base_url}/vary", headers={'X-Language': 'fr'})
+        results.append(("Vary keeps variants apart", english.text() == 'en' and french.text() == 'fr' and not french.from_cache))
+
+        await client.get(f"{base_url}/private", headers={'Authorization': 'alice'})
+        bob = await client.get(f"{base_url}/private", headers={'Authorization': 'bob'})
+        results.append(("Authorization bypasses cache", bob.text() == 'bob' and not bob.from_cache))
+
+        try:
+            (await client.get(f"{base_url}/missing")).raise_for_status()
+            results.append(("raise_for_status raises", False))
+        except HTTPStatusError as e:
+            results.append(("raise_for_status raises", e.status == 404 and '404' in str(e)))
+
+        for i in range(30):
+            await client.get(f"{base_url}/sized/{i}")
+        on_disk = sum(os.path.getsize(os.path.join(cache_dir, name)) for name in os.listdir(cache_dir))
+        results.append(("disk cache stays within budget", on_disk <= client.disk.max_bytes))
+    finally:
+        await client.close()
+
+    return results
+
+
+
+
+async def run(requests, host_limit, delay):
+
+    server = StubServer(delay)
+    runner, base_url = await serve_stub(server)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results = await check(server, base_url, cache_dir)
+
+    client = HTTPClient(host_limits={'127.0.0.1': host_limit})
+    await client.start()
+    try:
+        stop = asyncio.Event()
+        watcher = asyncio.create_task(watch_loop(stop))
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.get(f"{base_url}/slow/{i}", use_cache=False) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        worst_stall = await watcher
+    finally:
+        await client.close()
+
+    await runner.cleanup()
+
+    results.append(("host limit respected", server.peak <= host_limit))
+    for name, passed in results:
+        print(f"{'ok  ' if passed else 'FAIL'} {name}")
+    print()
+    print(f"requests:         {requests}")
+    print(f"host limit:       {host_limit}")
+    print(f"peak concurrency: {server.peak}")
+    print(f"elapsed:          {elapsed:.2f}s")
+    print(f"requests/sec:     {len(responses) / elapsed:.1f}")
+    print(f"worst loop stall: {worst_stall * 1000:.1f}ms")
+
+    return all(passed for _, passed in results)
+
+
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500, help="concurrent requests in the burst")
+    parser.add_argument('--host-limit', type=int, default=4, help="per-host concurrency limit for the stub server")
+    parser.add_argument('--delay', type=float, default=0.01, help="seconds the stub server holds each burst request")
+    args = parser.parse_args()
+
+    if not asyncio.run(run(args.requests, args.host_limit, args.delay)):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
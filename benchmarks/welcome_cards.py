@@ -0,0 +1,139 @@
+"""
+Benchmark for welcome card rendering under a simulated join burst
+
+Generates local avatar fixtures, serves them from a local aiohttp server and renders
+one card per simulated join through WelcomeCardRenderer, reporting cards/sec, avatar
+cache hits and the worst event loop stall seen during the burst.
+
+    python -m benchmarks.welcome_cards --joins 500 --avatars 100 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import serve, watch_loop  # noqa: E402
+from utils.http_client import HTTPClient  # noqa: E402
+from utils.welcome_card import WelcomeCardRenderer  # noqa: E402
+
+
+
+
+class FakeAsset:
+    """Stands in for discord.Asset, pointing at the local fixture server"""
+
+    def __init__(self, base_url, key):
+        self.key = key
+        self.url = f"{base_url}/avatars/{key}.png"
+
+    def with_format(self, format):
+        return self
+
+    def with_size(self, size):
+        return self
+
+
+class FakeGuild:
+    def __init__(self, name, member_count):
+        self.name = name
+        self.member_count = member_count
+
+
+class FakeMember:
+    def __init__(self, asset, display_name, guild):
+        self.display_avatar = asset
+        self.display_name = display_name
+        self.guild = guild
+
+
+
+
+# Function to write avatar fixtures into a directory
+def make_fixtures(directory, count):
+
+    from PIL import Image, ImageDraw
+
+    random.seed(0)
+    for i in range(count):
+        image = Image.new('RGB', (256, 256), tuple(random.randrange(256) for _ in range(3)))
+        ImageDraw.Draw(image).ellipse((48, 48, 208, 208), fill=tuple(random.randrange(256) for _ in range(3)))
+        image.save(os.path.join(directory, f"avatar{i}.png"))
+
+
+
+
+# Function to serve the fixture directory on a local port, returns (runner, base_url)
+async def serve_fixtures(directory):
+
+    app = web.Application()
+    app.router.add_static('/avatars', directory)
+    return await serve(app)
+
+
+
+
+async def run(joins, avatars, workers):
+
+    with tempfile.TemporaryDirectory() as directory:
+        make_fixtures(directory, avatars)
+        runner, base_url = await serve_fixtures(directory)
+
+        http_client = HTTPClient()
+        await http_client.start()
+        try:
+            renderer = WelcomeCardRenderer(http_client, workers=workers)
+            await renderer.start()
+
+            guild = FakeGuild("Benchmark Guild", 100000)
+            members = [
+                FakeMember(FakeAsset(base_url, f"avatar{random.randrange(avatars)}"), f"member{i}", guild)
+                for i in range(joins)
+            ]
+
+            stop = asyncio.Event()
+            watcher = asyncio.create_task(watch_loop(stop))
+
+            start = time.perf_counter()
+            cards = await asyncio.gather(*(renderer.render(member) for member in members))
+            elapsed = time.perf_counter() - start
+
+            stop.set()
+            worst_stall = await watcher
+            renderer.close()
+        finally:
+            await http_client.close()
+
+        await runner.cleanup()
+
+    print(f"joins:            {joins}")
+    print(f"unique avatars:   {avatars}")
+    print(f"workers:          {workers}")
+    print(f"elapsed:          {elapsed:.2f}s")
+    print(f"cards/sec:        {joins / elapsed:.1f}")
+    print(f"avg card size:    {sum(map(len, cards)) / len(cards) / 1024:.1f} KiB")
+    print(f"cache hits:       {renderer.cache.hits} / {renderer.cache.hits + renderer.cache.misses}")
+    print(f"worst loop stall: {worst_stall * 1000:.1f}ms")
+
+
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--joins', type=int, default=200, help="simulated member joins in the burst")
+    parser.add_argument('--avatars', type=int, default=50, help="distinct avatars among the joining members")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="render processes")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.joins, args.avatars, args.workers))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,30 +1,35 @@
 import os
+import asyncio
+import signal
+import time
 import discord
 from discord.ext import commands
-from dotenv import load_dotenv
 import logging
 
+from utils import startup
+from utils.config import Config
+from utils.helpers import flush_log_sends
+from utils.http_client import HTTPClient
 
 
 
-# Configure logging for error and info messages
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("bot.log"),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger('bot')
 
+logger = logging.getLogger('bot')
 
 
+# Configure logging for error and info messages
+# Called when the bot is started rather than at import, so importing the bot stays cheap
+def setup_logging(log_file="bot.log"):
 
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.insert(0, logging.FileHandler(log_file))
 
-# Load env.
-load_dotenv()
-TOKEN = os.getenv('TOKEN')
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
 
 # Define intents
 intents = discord.Intents.default()
@@ -32,6 +37,10 @@ intents.message_content = True
 intents.members = True
 intents.presences = True
 
+# Shutdown deadlines in seconds, overridable under "shutdown" in config.json
+DEFAULT_DRAIN_TIMEOUT = 15
+DEFAULT_FLUSH_TIMEOUT = 10
+
 
 
 
@@ -42,7 +51,8 @@ class DiscordBot:
     Main bot class responsible for setting up and running the Discord bot.
     """
     def __init__(self):
-        self.bot = commands.Bot(command_prefix='!', intents=intents, help_command=None)
+        # discord.py's global message cache is disabled, the message log cog keeps its own per-channel buffers
+        self.bot = commands.Bot(command_prefix='!', intents=intents, help_command=None, max_messages=None)
         
         @self.bot.event
         async def on_ready():
@@ -55,28 +65,165 @@ class DiscordBot:
             )
             logger.info(f'{self.bot.user.name} has connected to Discord!')
         
-        # Set up the async setup hook
+        @self.bot.event
+        async def on_message(message):
+            # Stop picking up new commands once shutdown has started
+            if self.shutting_down:
+                return
+            await self.bot.process_commands(message)
+        
+        # Track running commands so shutdown can wait for them
+        self.bot.before_invoke(self._command_started)
+        self.bot.after_invoke(self._command_finished)
+        
+        # Set up the async setup hook and shutdown
         self.bot.setup_hook = self.setup_hook
+        self._close = self.bot.close
+        self.bot.close = self.close
+        self.setup_hook_ms = None
+        self.shutting_down = False
+        self.in_flight = set()
+        self._drained = None
+        self._shutdown_task = None
     
     async def setup_hook(self):
-        # called before running the bot to load cogs.
+        # called before running the bot to open shared resources and load cogs.
+        start = time.perf_counter()
+
+        # One pooled HTTP client for everything the bot fetches outside the Discord API
+        settings = Config().get('http') or {}
+        self.bot.http_client = HTTPClient(**settings)
+        await self.bot.http_client.start()
         await self._load_cogs()
+
+        self.setup_hook_ms = startup.since_start_ms()
+        logger.info(
+            f"setup_hook finished in {(time.perf_counter() - start) * 1000:.0f}ms, "
+            f"{self.setup_hook_ms:.0f}ms after process start"
+        )
+    
+    async def close(self):
+        # Close the gateway connection, then the shared HTTP client
+        await self._close()
+        http_client = getattr(self.bot, 'http_client', None)
+        if http_client is not None:
+            await http_client.close()
     
     async def _load_cogs(self):
-        #Load all command cogs from the cogs directory
-        for filename in os.listdir('./cogs'):
+        #Load all command cogs from the cogs directory, skipping any listed in disabled_cogs
+        disabled = set(Config().get('disabled_cogs') or [])
+        for filename in sorted(os.listdir('./cogs')):
             if filename.endswith('.py') and not filename.startswith('__'):
+                if filename[:-3] in disabled:
+                    logger.info(f'Skipped disabled extension: {filename[:-3]}')
+                    continue
                 try:
+                    start = time.perf_counter()
                     await self.bot.load_extension(f'cogs.{filename[:-3]}')
-                    logger.info(f'Loaded extension: {filename[:-3]}')
+                    logger.info(f'Loaded extension: {filename[:-3]} ({(time.perf_counter() - start) * 1000:.0f}ms)')
                 except Exception as e:
                     logger.error(f'Failed to load extension {filename[:-3]}: {e}')
     
+    async def _command_started(self, ctx):
+        self.in_flight.add(ctx)
+        if self._drained is not None:
+            self._drained.clear()
+    
+    async def _command_finished(self, ctx):
+        self.in_flight.discard(ctx)
+        if not self.in_flight and self._drained is not None:
+            self._drained.set()
+    
+    async def shutdown(self, reason="shutdown requested"):
+        # Stop taking commands, drain running ones, flush queued writes, then close the gateway
+        if self.shutting_down:
+            logger.info(f"Shutdown already in progress, ignoring {reason}")
+            return
+        self.shutting_down = True
+
+        settings = Config().get('shutdown') or {}
+        drain_timeout = settings.get('drain_timeout', DEFAULT_DRAIN_TIMEOUT)
+        flush_timeout = settings.get('flush_timeout', DEFAULT_FLUSH_TIMEOUT)
+        logger.info(f"Shutting down ({reason})")
+        total_start = time.perf_counter()
+
+        # 1. Drain in-flight commands
+        start = time.perf_counter()
+        if self.in_flight:
+            logger.info(f"Waiting up to {drain_timeout}s for {len(self.in_flight)} running commands")
+            self._drained = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._drained.wait(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                names = ", ".join(sorted(ctx.command.qualified_name for ctx in self.in_flight))
+                logger.warning(f"Drain deadline reached, abandoning commands: {names}")
+        logger.info(f"Shutdown phase drain took {(time.perf_counter() - start) * 1000:.0f}ms")
+
+        # 2. Flush background queues: cogs with a flush() coroutine, then queued log channel sends
+        start = time.perf_counter()
+        for name, cog in list(self.bot.cogs.items()):
+            flush = getattr(cog, 'flush', None)
+            if flush is None:
+                continue
+            try:
+                await asyncio.wait_for(flush(), timeout=flush_timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Flushing {name} did not finish within {flush_timeout}s")
+            except Exception as e:
+                logger.error(f"Error flushing {name}: {e}")
+        unsent = await flush_log_sends(timeout=flush_timeout)
+        if unsent:
+            logger.error(f"{unsent} log channel messages were still unsent at the flush deadline")
+        logger.info(f"Shutdown phase flush took {(time.perf_counter() - start) * 1000:.0f}ms")
+
+        # 3. Unload cogs (closing their stores), close the gateway and the HTTP client
+        start = time.perf_counter()
+        await self.bot.close()
+        logger.info(f"Shutdown phase close took {(time.perf_counter() - start) * 1000:.0f}ms")
+        logger.info(f"Shutdown complete in {(time.perf_counter() - total_start) * 1000:.0f}ms")
+    
+    def _on_signal(self, sig):
+        # Keep a reference so the shutdown task is not garbage collected mid-way and _run can wait for it
+        if self._shutdown_task is not None:
+            logger.info(f"Shutdown already in progress, ignoring {sig.name}")
+            return
+        self._shutdown_task = asyncio.create_task(self.shutdown(sig.name))
+    
+    async def _run(self, token):
+        # Run the bot with SIGTERM/SIGINT routed through the graceful shutdown
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self._on_signal, sig)
+            except (NotImplementedError, RuntimeError):
+                # Signal handlers are not available on Windows event loops
+                pass
+
+        async with self.bot:
+            await self.bot.start(token)
+
+        # bot.start returns as soon as close() runs, so let the shutdown finish its logging
+        # and cleanup instead of having asyncio.run cancel it
+        if self._shutdown_task is not None:
+            await self._shutdown_task
+    
+    async def startup_check(self):
+        # Run setup_hook without connecting to Discord and return how long startup took
+        async with self.bot:
+            await self.setup_hook()
+        return self.setup_hook_ms
+    
     def run_bot(self):
         # Start the bot
+        from dotenv import load_dotenv
+
+        setup_logging()
+        load_dotenv()
         try:
             logger.info("Starting bot...")
-            self.bot.run(TOKEN)
+            asyncio.run(self._run(os.getenv('TOKEN')))
+        except KeyboardInterrupt:
+            pass
         except Exception as e:
             logger.critical(f"Failed to start bot: {e}")
 
@@ -0,0 +1,208 @@
+import discord
+from discord.ext import commands, tasks
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from utils.activity import ActivityStore, DEFAULT_PATH, DEFAULT_FLUSH_INTERVAL, HOUR
+from utils.config import Config
+from utils.helpers import format_time
+
+
+logger = logging.getLogger('bot.activity')
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+DAY = 86400
+
+
+
+# Function to draw a list of counts as a one-line sparkline
+def sparkline(values):
+
+    peak = max(values) if values else 0
+    if peak == 0:
+        return SPARK_CHARS[0] * len(values)
+    return "".join(SPARK_CHARS[min(len(SPARK_CHARS) - 1, value * len(SPARK_CHARS) // (peak + 1))] for value in values)
+
+
+
+
+
+
+class Activity(commands.Cog):
+    """Message and voice activity statistics"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+        settings = Config().get('activity') or {}
+        self.store = ActivityStore(path=settings.get('path', DEFAULT_PATH))
+        self.flush_interval = settings.get('flush_interval', DEFAULT_FLUSH_INTERVAL)
+        self.voice_sessions = {}  # (guild_id, user_id) -> (channel_id, started_at)
+
+
+    async def cog_load(self):
+        await self.store.open()
+        self.flush_activity.change_interval(seconds=self.flush_interval)
+        self.flush_activity.start()
+
+
+    async def cog_unload(self):
+        self.flush_activity.cancel()
+        await self.flush()
+        await self.store.close()
+
+
+    # Function to credit open voice sessions up to now and write all counters to disk
+    async def flush(self):
+
+        now = time.time()
+        for (guild_id, user_id), (channel_id, started_at) in self.voice_sessions.items():
+            self.store.counters.add_voice(guild_id, user_id, channel_id, started_at, now)
+            self.voice_sessions[(guild_id, user_id)] = (channel_id, now)
+
+        rows = await self.store.flush()
+        if rows:
+            logger.debug(f"Flushed {rows} activity rows")
+
+
+    @tasks.loop(seconds=DEFAULT_FLUSH_INTERVAL)
+    async def flush_activity(self):
+        await self.flush()
+
+
+
+
+
+    """------------------------------ Listeners ------------------------------"""
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+
+        # Rebuild sessions from live voice states; after a reconnect, members who left or
+        # moved while we were away are credited up to now and their old session closed
+        now = time.time()
+        live = {}
+        for guild in self.bot.guilds:
+            for channel in guild.voice_channels + guild.stage_channels:
+                for member in channel.members:
+                    if not member.bot:
+                        live[(guild.id, member.id)] = channel.id
+
+        for (guild_id, user_id), (channel_id, started_at) in list(self.voice_sessions.items()):
+            if live.get((guild_id, user_id)) != channel_id:
+                self.store.counters.add_voice(guild_id, user_id, channel_id, started_at, now)
+                del self.voice_sessions[(guild_id, user_id)]
+
+        for key, channel_id in live.items():
+            self.voice_sessions.setdefault(key, (channel_id, now))
+
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+
+        if message.guild is None or message.author.bot:
+            return
+        self.store.counters.add_message(message.guild.id, message.author.id, message.channel.id, message.created_at.timestamp())
+
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+
+        if member.bot or before.channel == after.channel:
+            return
+
+        now = time.time()
+        key = (member.guild.id, member.id)
+
+        session = self.voice_sessions.pop(key, None)
+        if session is not None:
+            channel_id, started_at = session
+            self.store.counters.add_voice(member.guild.id, member.id, channel_id, started_at, now)
+
+        if after.channel is not None:
+            self.voice_sessions[key] = (after.channel.id, now)
+
+
+
+
+
+    # Function to show the most active members by messages or voice time
+    @commands.command(name='leaderboard')
+    async def leaderboard(self, ctx, metric: str = 'messages', days: int = 7):
+
+        metric = metric.lower()
+        if metric not in ('messages', 'voice'):
+            await ctx.send("Please choose `messages` or `voice`.")
+            return
+        if days < 1 or days > 365:
+            await ctx.send("Please choose between 1 and 365 days.")
+            return
+
+        column = 'messages' if metric == 'messages' else 'voice_seconds'
+        rows = await self.store.leaderboard(ctx.guild.id, time.time() - days * DAY, column)
+
+        embed = discord.Embed(
+            title=f"{'Message' if metric == 'messages' else 'Voice'} Leaderboard",
+            color=discord.Color.gold(),
+            timestamp=datetime.now()
+        )
+
+        if not rows:
+            embed.description = "No activity recorded yet."
+        else:
+            lines = []
+            for rank, (user_id, total) in enumerate(rows, start=1):
+                value = f"{total} messages" if metric == 'messages' else format_time(total)
+                lines.append(f"**{rank}.** <@{user_id}> — {value}")
+            embed.description = "\n".join(lines)
+
+        embed.set_footer(text=f"Last {days} days | Updated every {self.flush_interval}s")
+        await ctx.send(embed=embed)
+
+
+
+
+
+    # Function to graph message activity for the server or one channel
+    @commands.command(name='activity')
+    async def activity(self, ctx, channel: Optional[discord.TextChannel] = None, days: int = 1):
+
+        if days < 1 or days > 90:
+            await ctx.send("Please choose between 1 and 90 days.")
+            return
+
+        # Hourly buckets for short windows, daily for anything longer
+        bucket = HOUR if days <= 2 else DAY
+        now = time.time()
+        start = int(now - days * DAY) // bucket * bucket
+        counts = await self.store.timeline(ctx.guild.id, start, channel.id if channel else None, bucket)
+
+        values = [counts.get(ts, 0) for ts in range(start, int(now) + 1, bucket)]
+        unit = "hour" if bucket == HOUR else "day"
+        busiest = max(range(len(values)), key=values.__getitem__) if values else 0
+
+        embed = discord.Embed(
+            title=f"Activity: {channel.name if channel else ctx.guild.name}",
+            description=f"`{sparkline(values)}`",
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        embed.add_field(name="Messages", value=str(sum(values)), inline=True)
+        embed.add_field(name=f"Average per {unit}", value=f"{sum(values) / max(1, len(values)):.1f}", inline=True)
+        if values and values[busiest]:
+            busiest_at = datetime.fromtimestamp(start + busiest * bucket, timezone.utc)
+            embed.add_field(name=f"Busiest {unit}", value=f"<t:{int(busiest_at.timestamp())}:f> ({values[busiest]})", inline=True)
+        embed.set_footer(text=f"Last {days} days, one bar per {unit}")
+        await ctx.send(embed=embed)
+
+
+
+
+
+
+
+# Function to add the cog to the bot
+async def setup(bot):
+    await bot.add_cog(Activity(bot))
@@ -4,6 +4,8 @@ from discord.ext import commands
 import asyncio
 from datetime import datetime, timedelta, timezone
 
+from utils.member_index import AmbiguousMember, FuzzyMember
+
 class AdminCommands(commands.Cog):
     #Commands for server administration and moderation
     def __init__(self, bot):
@@ -34,7 +36,7 @@ class AdminCommands(commands.Cog):
     #Function to kick a member from the server 
     @commands.command(name='kick')
     @commands.has_permissions(kick_members=True)
-    async def kick(self, ctx, member: discord.Member, *, reason=None):
+    async def kick(self, ctx, member: FuzzyMember, *, reason=None):
 
         await member.kick(reason=reason)
         await ctx.send(f'{member.mention} has been kicked. Reason: {reason or "No reason provided"}')
@@ -46,7 +48,7 @@ class AdminCommands(commands.Cog):
     #Function to ban a member from the server 
     @commands.command(name='ban')
     @commands.has_permissions(ban_members=True)
-    async def ban(self, ctx, member: discord.Member, *, reason=None):
+    async def ban(self, ctx, member: FuzzyMember, *, reason=None):
 
         await member.ban(reason=reason)
         await ctx.send(f'{member.mention} has been banned. Reason: {reason or "No reason provided"}')
@@ -59,7 +61,7 @@ class AdminCommands(commands.Cog):
 
     @commands.command(name='timeout')
     @commands.has_permissions(moderate_members=True)
-    async def timeout(self, ctx, member: discord.Member, minutes: int, *, reason=None):
+    async def timeout(self, ctx, member: FuzzyMember, minutes: int, *, reason=None):
 
         status_msg = await ctx.send(f" Attempting to timeout {member.display_name}...")
         
@@ -135,6 +137,9 @@ class AdminCommands(commands.Cog):
         if not config.get('log_channel'):
             log_channel = await ctx.guild.create_text_channel('bot-logs')
             config.set('log_channel', log_channel.id)
+            message_log = self.bot.get_cog('MessageLog')
+            if message_log is not None:
+                message_log.log_channel_id = log_channel.id
             await ctx.send(f"Created log channel: {log_channel.mention}")
             
         await ctx.send("Setup complete!")
@@ -160,6 +165,8 @@ class AdminCommands(commands.Cog):
     async def mod_command_error(self, ctx, error):
         if isinstance(error, commands.MissingPermissions):
             await ctx.send("You don't have permission to use this command.")
+        elif isinstance(error, AmbiguousMember):
+            await ctx.send(str(error))
         elif isinstance(error, commands.MemberNotFound):
             await ctx.send("Member not found. Please provide a valid mention or ID.")
         elif isinstance(error, commands.BadArgument):
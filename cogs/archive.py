@@ -0,0 +1,259 @@
+import discord
+from discord.ext import commands, tasks
+import logging
+import time
+from typing import Optional
+
+from utils.config import Config
+from utils.helpers import parse_duration
+from utils.message_archive import MessageArchive, DEFAULT_PATH, DEFAULT_BATCH_SIZE, DEFAULT_QUEUE_SIZE, DEFAULT_RETENTION_DAYS
+
+
+logger = logging.getLogger('bot.archive')
+
+RESULTS_PER_PAGE = 10
+
+
+
+class SearchPages(discord.ui.View):
+    """Previous/next buttons for paging through archive search results"""
+
+    def __init__(self, archive, author, guild_id, query, filters, total):
+        super().__init__(timeout=120)
+        self.archive = archive
+        self.author = author
+        self.guild_id = guild_id
+        self.query = query
+        self.filters = filters
+        self.total = total
+        self.page = 0
+        self.message = None
+        self._update_buttons()
+
+    @property
+    def pages(self):
+        return max(1, -(-self.total // RESULTS_PER_PAGE))
+
+    def _update_buttons(self):
+        self.previous.disabled = self.page == 0
+        self.next.disabled = self.page >= self.pages - 1
+
+    async def interaction_check(self, interaction):
+        return interaction.user.id == self.author.id
+
+    async def on_timeout(self):
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+    async def _show(self, interaction):
+        total, rows = await self.archive.search(
+            self.guild_id,
+            self.query,
+            limit=RESULTS_PER_PAGE,
+            offset=self.page * RESULTS_PER_PAGE,
+            **self.filters
+        )
+        self.total = total
+        self._update_buttons()
+        await interaction.response.edit_message(embed=results_embed(self.guild_id, self.query, total, rows, self.page), view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction, button):
+        self.page = max(0, self.page - 1)
+        await self._show(interaction)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction, button):
+        self.page = min(self.pages - 1, self.page + 1)
+        await self._show(interaction)
+
+
+
+
+# Function to build the embed for one page of search results
+def results_embed(guild_id, query, total, rows, page):
+
+    pages = max(1, -(-total // RESULTS_PER_PAGE))
+    embed = discord.Embed(
+        title=f"Search: {query}",
+        color=discord.Color.blue()
+    )
+
+    if not rows:
+        embed.description = "No archived messages matched."
+    else:
+        lines = []
+        for message_id, channel_id, author_id, created_at, snippet in rows:
+            link = f"https://discord.com/channels/{guild_id}/{channel_id}/{message_id}"
+            lines.append(f"<t:{created_at}:R> <@{author_id}> in <#{channel_id}> [jump]({link})\n{snippet[:250]}")
+        embed.description = "\n\n".join(lines)
+
+    embed.set_footer(text=f"{total} results | Page {page + 1}/{pages}")
+    return embed
+
+
+
+
+
+
+class SearchFlags(commands.FlagConverter):
+    """Filters for !search, e.g. !search deploy failed user: @bob channel: #general since: 7d"""
+
+    query: str = commands.flag(positional=True)
+    user: Optional[discord.Member] = None
+    channel: Optional[discord.TextChannel] = None
+    since: Optional[str] = None
+
+
+
+
+
+
+class Archive(commands.Cog):
+    """Searchable archive of messages from opted-in channels"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+        config = Config()
+        settings = config.get('archive') or {}
+        self.channels = set(settings.get('channels', []))
+        self.archive = MessageArchive(
+            path=settings.get('path', DEFAULT_PATH),
+            batch_size=settings.get('batch_size', DEFAULT_BATCH_SIZE),
+            queue_size=settings.get('queue_size', DEFAULT_QUEUE_SIZE),
+            retention_days=settings.get('retention_days', DEFAULT_RETENTION_DAYS)
+        )
+
+
+    async def cog_load(self):
+        await self.archive.start()
+        self.prune_archive.start()
+
+
+    async def cog_unload(self):
+        self.prune_archive.cancel()
+        await self.archive.close()
+
+
+    # Function to write out queued messages, called during shutdown
+    async def flush(self):
+        await self.archive.flush()
+
+
+    @tasks.loop(hours=6)
+    async def prune_archive(self):
+        try:
+            await self.archive.prune()
+        except Exception as e:
+            logger.error(f"Error pruning message archive: {e}")
+
+
+    # Function to persist the set of archived channels
+    def _save_channels(self):
+
+        config = Config()
+        settings = config.get('archive') or {}
+        settings['channels'] = sorted(self.channels)
+        config.set('archive', settings)
+
+
+
+
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+
+        if message.channel.id not in self.channels or message.author.bot or not message.content:
+            return
+        self.archive.push(message)
+
+
+
+
+
+    # Function to opt the current channel in or out of the archive
+    @commands.command(name='archive')
+    @commands.has_permissions(manage_guild=True)
+    async def archive_channel(self, ctx, state: str = None):
+
+        if state is None:
+            status = "archived" if ctx.channel.id in self.channels else "not archived"
+            await ctx.send(f"{ctx.channel.mention} is {status}. Use `!archive on` or `!archive off`.")
+            return
+
+        state = state.lower()
+        if state == 'on':
+            self.channels.add(ctx.channel.id)
+            await ctx.send(f"Messages in {ctx.channel.mention} will now be archived for `!search`.")
+        elif state == 'off':
+            self.channels.discard(ctx.channel.id)
+            await ctx.send(f"Messages in {ctx.channel.mention} will no longer be archived.")
+        else:
+            await ctx.send("Please use `on` or `off`.")
+            return
+
+        self._save_channels()
+
+
+
+
+
+    # Function to search archived messages, e.g. !search deploy failed user: @bob channel: #general since: 7d
+    @commands.command(name='search')
+    @commands.has_permissions(manage_messages=True)
+    async def search(self, ctx, *, flags: SearchFlags):
+
+        query = flags.query
+        since = flags.since
+        filters = {
+            'author_id': flags.user.id if flags.user else None,
+            'channel_id': flags.channel.id if flags.channel else None,
+            'since': None
+        }
+
+        if since is not None:
+            seconds = parse_duration(since)
+            if seconds is None:
+                await ctx.send("Please give `since` as a duration such as `30m`, `12h`, `7d` or `2w`.")
+                return
+            filters['since'] = time.time() - seconds
+
+        total, rows = await self.archive.search(ctx.guild.id, query, limit=RESULTS_PER_PAGE, **filters)
+        embed = results_embed(ctx.guild.id, query, total, rows, 0)
+
+        if total <= RESULTS_PER_PAGE:
+            await ctx.send(embed=embed)
+            return
+
+        view = SearchPages(self.archive, ctx.author, ctx.guild.id, query, filters, total)
+        view.message = await ctx.send(embed=embed, view=view)
+
+
+
+
+
+    """------------------------------ Error Handlers ------------------------------"""
+
+    @archive_channel.error
+    @search.error
+    async def archive_command_error(self, ctx, error):
+        if isinstance(error, commands.MissingPermissions):
+            await ctx.send("You don't have permission to use this command.")
+        elif isinstance(error, (commands.MissingRequiredArgument, commands.MissingRequiredFlag)):
+            await ctx.send('Usage: `!search <query> [user: <member>] [channel: <channel>] [since: <duration>]`')
+        elif isinstance(error, commands.BadArgument):
+            await ctx.send(str(error))
+
+
+
+
+
+
+
+# Function to add the cog to the bot
+async def setup(bot):
+    await bot.add_cog(Archive(bot))
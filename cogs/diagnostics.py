@@ -0,0 +1,82 @@
+import discord
+from discord.ext import commands
+import asyncio
+import io
+import logging
+from datetime import datetime
+
+from utils.profiler import SamplingProfiler, handler_labels, DEFAULT_INTERVAL
+
+
+logger = logging.getLogger('bot.diagnostics')
+
+MAX_PROFILE_SECONDS = 120
+TOP_FUNCTIONS = 25
+
+
+
+class Diagnostics(commands.Cog):
+    """Owner-only tools for diagnosing a running bot"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.profile_lock = asyncio.Lock()
+
+
+
+
+
+    # Function to sample the running bot for a number of seconds and report where the time went
+    @commands.command(name='profile', hidden=True)
+    @commands.is_owner()
+    async def profile(self, ctx, seconds: int = 10):
+
+        if seconds < 1 or seconds > MAX_PROFILE_SECONDS:
+            await ctx.send(f"Please choose between 1 and {MAX_PROFILE_SECONDS} seconds.")
+            return
+        if self.profile_lock.locked():
+            await ctx.send("A profile is already running.")
+            return
+
+        async with self.profile_lock:
+            status_msg = await ctx.send(f"Profiling for {seconds}s...")
+            logger.info(f"Profiling for {seconds}s, requested by {ctx.author}")
+
+            # The sampler runs on its own thread so the event loop keeps serving while we watch it
+            profiler = SamplingProfiler(handler_labels(self.bot), interval=DEFAULT_INTERVAL)
+            await asyncio.to_thread(profiler.run, seconds)
+
+            summary = profiler.summary(top=TOP_FUNCTIONS)
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+            files = [
+                discord.File(io.BytesIO(profiler.collapsed().encode()), filename=f"profile-{stamp}.collapsed"),
+                discord.File(io.BytesIO(summary.encode()), filename=f"profile-{stamp}-summary.txt")
+            ]
+
+            # First few summary lines inline, the rest is in the attachment
+            preview = "\n".join(summary.splitlines()[:12])
+            await status_msg.edit(content=f"Profile complete. Open the `.collapsed` file in speedscope or flamegraph.pl.\n```\n{preview[:1800]}\n```")
+            await ctx.send(files=files)
+
+
+
+
+
+    """------------------------------ Error Handlers ------------------------------"""
+
+    @profile.error
+    async def profile_error(self, ctx, error):
+        if isinstance(error, commands.NotOwner):
+            await ctx.send("Only the bot owner can use this command.")
+        elif isinstance(error, commands.BadArgument):
+            await ctx.send("Please provide a number of seconds.")
+
+
+
+
+
+
+
+# Function to add the cog to the bot
+async def setup(bot):
+    await bot.add_cog(Diagnostics(bot))
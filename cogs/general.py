@@ -1,15 +1,52 @@
 import discord
 from discord.ext import commands
+import io
+import logging
 import platform
 import time
 from datetime import datetime
 
+from utils.config import Config
+from utils.welcome_card import WelcomeCardRenderer, DEFAULT_CACHE_BYTES, DEFAULT_WORKERS
+
+
+logger = logging.getLogger('bot.general')
+
 class General(commands.Cog):
     """General purpose commands"""
     
     def __init__(self, bot):
         self.bot = bot
         self.start_time = datetime.now()
+        self.cards = None
+
+
+    async def cog_load(self):
+        # Welcome cards need Pillow, without it joins fall back to the plain embed
+        settings = Config().get('welcome_cards') or {}
+        if not settings.get('enabled', True):
+            return
+        if not WelcomeCardRenderer.available():
+            logger.warning("Pillow is not installed, welcome cards are disabled")
+            return
+
+        self.cards = WelcomeCardRenderer(
+            self.bot.http_client,
+            workers=settings.get('workers', DEFAULT_WORKERS),
+            cache_bytes=settings.get('cache_bytes', DEFAULT_CACHE_BYTES),
+            background=settings.get('background')
+        )
+        try:
+            await self.cards.start()
+        except Exception as e:
+            logger.error(f"Failed to start welcome card renderer: {e}")
+            self.cards.close()
+            self.cards = None
+
+
+    async def cog_unload(self):
+        if self.cards is not None:
+            self.cards.close()
 
 
 
@@ -197,7 +234,6 @@ class General(commands.Cog):
     @commands.Cog.listener()
     async def on_member_join(self, member):
 
-        from utils.config import Config
         config = Config()
         
         welcome_channel_id = config.get('welcome_channel')
@@ -209,8 +245,21 @@ class General(commands.Cog):
                     description=f"Hello {member.mention}! Welcome to the server!",
                     color=discord.Color.green()
                 )
-                embed.set_thumbnail(url=member.avatar.url if member.avatar else None)
-                await channel.send(embed=embed)
+
+                # Rendered card when available, plain thumbnail otherwise
+                card = None
+                if self.cards is not None:
+                    try:
+                        card = await self.cards.render(member)
+                    except Exception as e:
+                        logger.error(f"Failed to render welcome card for {member}: {e}")
+
+                if card:
+                    embed.set_image(url="attachment://welcome.png")
+                    await channel.send(embed=embed, file=discord.File(io.BytesIO(card), filename="welcome.png"))
+                else:
+                    embed.set_thumbnail(url=member.avatar.url if member.avatar else None)
+                    await channel.send(embed=embed)
 
 
 
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from discord.ext import commands
+
+from utils.member_index import MemberIndex, member_names
+
+
+logger = logging.getLogger('bot.member_index')
+
+# Members indexed per event loop tick while building, keeps each stall to a few tens of ms
+BUILD_CHUNK = 2000
+
+
+
+class MemberIndexer(commands.Cog):
+    """Keeps the per-guild member name indexes used by the FuzzyMember converter up to date"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        if not hasattr(bot, 'member_indexes'):
+            bot.member_indexes = {}
+        self.indexes = bot.member_indexes
+        self.building = {}  # guild_id -> (method name, argument) changes seen while its index was being built
+
+
+
+
+    # Function to build a guild's index from its cached member list, once per guild
+    async def build_index(self, guild):
+
+        if guild.id in self.indexes or guild.id in self.building:
+            return
+
+        start = time.perf_counter()
+        changes = self.building[guild.id] = []
+        index = MemberIndex()
+        members = list(guild.members)
+
+        # Load in chunks, yielding between them so event dispatch keeps running
+        for i in range(0, len(members), BUILD_CHUNK):
+            index.extend(members[i:i + BUILD_CHUNK])
+            await asyncio.sleep(0)
+        while index.merge_step():
+            await asyncio.sleep(0)
+        index.finish()
+
+        # The guild may have been left (and even rejoined) while we were building
+        if self.building.get(guild.id) is not changes:
+            return
+        del self.building[guild.id]
+        for method, argument in changes:
+            getattr(index, method)(argument)
+
+        self.indexes[guild.id] = index
+        logger.info(f"Indexed {len(index)} members of {guild.name} in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+    # Function to apply a member change to a guild's index, or hold it until the index is built
+    def _apply(self, guild_id, method, argument):
+
+        changes = self.building.get(guild_id)
+        if changes is not None:
+            changes.append((method, argument))
+            return
+
+        index = self.indexes.get(guild_id)
+        if index is not None:
+            getattr(index, method)(argument)
+
+
+
+
+
+    """------------------------------ Listeners ------------------------------"""
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+
+        # on_ready fires again after reconnects; guilds already indexed are kept up to date by events
+        for guild in self.bot.guilds:
+            await self.build_index(guild)
+
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+
+        await self.build_index(guild)
+
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+
+        self.indexes.pop(guild.id, None)
+        self.building.pop(guild.id, None)
+
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+
+        self._apply(member.guild.id, 'add', member)
+
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+
+        if member_names(before) == member_names(after):
+            return
+        self._apply(after.guild.id, 'update', after)
+
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before, after):
+
+        # Username and global name changes arrive once per user, not per guild
+        if before.name == after.name and before.global_name == after.global_name:
+            return
+        for guild in self.bot.guilds:
+            member = guild.get_member(after.id)
+            if member is not None:
+                self._apply(guild.id, 'update', member)
+
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload):
+
+        self._apply(payload.guild_id, 'remove', payload.user.id)
+
+
+
+
+
+
+
+# Function to add the cog to the bot
+async def setup(bot):
+    await bot.add_cog(MemberIndexer(bot))
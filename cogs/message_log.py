@@ -0,0 +1,182 @@
+import discord
+from discord.ext import commands
+import logging
+from datetime import datetime
+
+from utils.config import Config
+from utils.helpers import queue_log_send
+from utils.message_cache import MessageCache, DEFAULT_PER_CHANNEL, DEFAULT_MAX_BYTES, DEFAULT_CONTENT_LIMIT, truncate
+
+
+logger = logging.getLogger('bot.message_log')
+
+# Most deleted messages listed in one bulk-delete log entry
+BULK_LOG_LIMIT = 15
+
+
+
+class MessageLog(commands.Cog):
+    """Logs deleted and edited messages to the configured log channel"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+        config = Config()
+        settings = config.get('message_cache') or {}
+        # Read once here rather than per event; !setup updates it when it creates the channel
+        self.log_channel_id = config.get('log_channel')
+        self.cache = MessageCache(
+            per_channel=settings.get('per_channel', DEFAULT_PER_CHANNEL),
+            max_bytes=settings.get('max_bytes', DEFAULT_MAX_BYTES),
+            content_limit=settings.get('content_limit', DEFAULT_CONTENT_LIMIT)
+        )
+
+
+
+
+
+    # Function to look up the log channel, skipping events that happen inside it
+    def _log_channel(self, source_channel_id=None):
+
+        if not self.log_channel_id or self.log_channel_id == source_channel_id:
+            return None
+        return self.bot.get_channel(self.log_channel_id)
+
+
+    # Sends are queued so a burst of deletes never holds up event dispatch, and shutdown flushes them
+    async def _send(self, channel, embed):
+
+        queue_log_send(channel, embed)
+
+
+    # Function to describe a cached message's author and channel as embed fields
+    def _add_origin(self, embed, record):
+
+        embed.add_field(name="Author", value=f"<@{record.author_id}>", inline=True)
+        embed.add_field(name="Channel", value=f"<#{record.channel_id}>", inline=True)
+        if record.attachments:
+            embed.add_field(name="Attachments", value=str(record.attachments), inline=True)
+        embed.set_footer(text=f"Message ID: {record.id}")
+
+
+
+
+
+    """------------------------------ Listeners ------------------------------"""
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+
+        # Bot messages (including our own log entries) are never audited
+        if message.guild is None or message.author.bot:
+            return
+        self.cache.add(message)
+
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+
+        record = self.cache.pop(payload.channel_id, payload.message_id)
+        if record is None:
+            return
+
+        channel = self._log_channel(payload.channel_id)
+        if channel is None:
+            return
+
+        embed = discord.Embed(
+            title="Message Deleted",
+            description=record.content or "*No text content*",
+            color=discord.Color.red(),
+            timestamp=datetime.now()
+        )
+        self._add_origin(embed, record)
+        await self._send(channel, embed)
+
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload):
+
+        # Embed-only updates (link previews) carry no content and are not edits
+        content = payload.data.get('content')
+        if content is None:
+            return
+
+        record = self.cache.get(payload.channel_id, payload.message_id)
+        if record is None or record.content == truncate(content, self.cache.content_limit):
+            return
+
+        before = self.cache.edit(payload.channel_id, payload.message_id, content)
+
+        channel = self._log_channel(payload.channel_id)
+        if channel is None:
+            return
+
+        embed = discord.Embed(
+            title="Message Edited",
+            color=discord.Color.gold(),
+            timestamp=datetime.now()
+        )
+        embed.add_field(name="Before", value=truncate(before, 1024) or "*No text content*", inline=False)
+        embed.add_field(name="After", value=truncate(record.content, 1024) or "*No text content*", inline=False)
+        self._add_origin(embed, record)
+        embed.add_field(
+            name="Jump",
+            value=f"https://discord.com/channels/{payload.guild_id}/{payload.channel_id}/{payload.message_id}",
+            inline=False
+        )
+        await self._send(channel, embed)
+
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload):
+
+        records = []
+        for message_id in sorted(payload.message_ids):
+            record = self.cache.pop(payload.channel_id, message_id)
+            if record is not None:
+                records.append(record)
+
+        channel = self._log_channel(payload.channel_id)
+        if channel is None:
+            return
+
+        lines = [
+            f"<@{record.author_id}>: {truncate(record.content, 200) or '*No text content*'}"
+            for record in records[-BULK_LOG_LIMIT:]
+        ]
+        if len(records) > BULK_LOG_LIMIT:
+            lines.insert(0, f"*…and {len(records) - BULK_LOG_LIMIT} earlier cached messages*")
+
+        embed = discord.Embed(
+            title="Messages Bulk Deleted",
+            description="\n".join(lines) or "*None of the deleted messages were cached*",
+            color=discord.Color.dark_red(),
+            timestamp=datetime.now()
+        )
+        embed.add_field(name="Channel", value=f"<#{payload.channel_id}>", inline=True)
+        embed.add_field(name="Count", value=str(len(payload.message_ids)), inline=True)
+        await self._send(channel, embed)
+
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+
+        self.cache.drop_channel(channel.id)
+
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+
+        for channel in guild.channels:
+            self.cache.drop_channel(channel.id)
+
+
+
+
+
+
+
+# Function to add the cog to the bot
+async def setup(bot):
+    await bot.add_cog(MessageLog(bot))
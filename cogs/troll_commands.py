@@ -4,6 +4,8 @@ import random
 import asyncio
 import datetime
 
+from utils.member_index import AmbiguousMember, FuzzyMember
+
 class TrollCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -64,7 +66,7 @@ class TrollCommands(commands.Cog):
     # Function to disconnect a user from voice channel
     @commands.command(name='disconnect')
     @commands.has_permissions(move_members=True)
-    async def disconnect_user(self, ctx, target: discord.Member = None):
+    async def disconnect_user(self, ctx, target: FuzzyMember = None):
 
         if target is None:
             await ctx.send("Please mention a user to disconnect")
@@ -77,6 +79,23 @@ class TrollCommands(commands.Cog):
         await target.move_to(None)  # Disconnect the user
         await ctx.message.delete()  # Delete the command for stealth
     
+
+
+
+
+    """------------------------------ Error Handlers ------------------------------"""
+
+    @disconnect_user.error
+    async def disconnect_error(self, ctx, error):
+        if isinstance(error, commands.MissingPermissions):
+            await ctx.send("You don't have permission to use this command.")
+        elif isinstance(error, AmbiguousMember):
+            await ctx.send(str(error))
+        elif isinstance(error, commands.MemberNotFound):
+            await ctx.send("Member not found. Please provide a valid mention or ID.")
+        elif isinstance(error, commands.BadArgument):
+            await ctx.send("Please provide valid arguments for the command.")
+    
     
     
 
@@ -0,0 +1,166 @@
+import discord
+from discord.ext import commands
+from typing import Union
+
+from utils.config import Config
+from utils.fanout import fan_out, DEFAULT_CONCURRENCY, DEFAULT_RETRIES
+
+
+VoiceChannel = Union[discord.VoiceChannel, discord.StageChannel]
+
+# Most failed members listed by name in a summary
+FAILURE_LIST_LIMIT = 10
+
+
+
+class VoiceCommands(commands.Cog):
+    """Channel-wide voice moderation"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+        settings = Config().get('voice_fanout') or {}
+        self.concurrency = settings.get('concurrency', DEFAULT_CONCURRENCY)
+        self.retries = settings.get('retries', DEFAULT_RETRIES)
+
+
+
+
+
+    # Function to run an operation over every member currently in a channel
+    async def _run(self, channel, operation):
+
+        members = list(channel.members)
+        return await fan_out(members, operation, concurrency=self.concurrency, retries=self.retries)
+
+
+    # Function to report how a channel-wide operation went
+    async def _send_summary(self, ctx, title, result):
+
+        embed = discord.Embed(
+            title=title,
+            color=discord.Color.green() if not result.failed else discord.Color.orange()
+        )
+        embed.add_field(name="Succeeded", value=str(len(result.succeeded)), inline=True)
+        embed.add_field(name="Skipped", value=str(len(result.skipped)), inline=True)
+        embed.add_field(name="Failed", value=str(len(result.failed)), inline=True)
+        embed.add_field(name="Time", value=f"{result.elapsed:.2f}s", inline=True)
+        embed.add_field(name="Retries", value=str(result.retries), inline=True)
+
+        if result.failed:
+            lines = [f"{member.mention}: {error}"[:100] for member, error in result.failed[:FAILURE_LIST_LIMIT]]
+            if len(result.failed) > FAILURE_LIST_LIMIT:
+                lines.append(f"…and {len(result.failed) - FAILURE_LIST_LIMIT} more")
+            embed.add_field(name="Failures", value="\n".join(lines), inline=False)
+
+        embed.set_footer(text=f"Requested by {ctx.author}")
+        await ctx.send(embed=embed)
+
+
+
+
+
+    @commands.group(name='voice', invoke_without_command=True)
+    async def voice(self, ctx):
+
+        await ctx.send("Usage: `!voice move-all <from> <to>`, `!voice disconnect-all <channel>`, `!voice mute-all <channel> [on|off]`")
+
+
+
+
+    # Function to move everyone from one voice channel to another
+    @voice.command(name='move-all')
+    @commands.has_permissions(move_members=True)
+    async def move_all(self, ctx, source: VoiceChannel, destination: VoiceChannel):
+
+        if source == destination:
+            await ctx.send("Source and destination are the same channel.")
+            return
+        if not source.members:
+            await ctx.send(f"{source.mention} is empty.")
+            return
+
+        async def move(member):
+            # Members who left or were moved elsewhere since we started are skipped
+            if member.voice is None or member.voice.channel != source:
+                return False
+            await member.move_to(destination, reason=f"move-all by {ctx.author}")
+
+        result = await self._run(source, move)
+        await self._send_summary(ctx, f"Moved {source.name} → {destination.name}", result)
+
+
+
+
+    # Function to disconnect everyone in a voice channel
+    @voice.command(name='disconnect-all')
+    @commands.has_permissions(move_members=True)
+    async def disconnect_all(self, ctx, channel: VoiceChannel):
+
+        if not channel.members:
+            await ctx.send(f"{channel.mention} is empty.")
+            return
+
+        async def disconnect(member):
+            if member.voice is None or member.voice.channel != channel:
+                return False
+            await member.move_to(None, reason=f"disconnect-all by {ctx.author}")
+
+        result = await self._run(channel, disconnect)
+        await self._send_summary(ctx, f"Disconnected {channel.name}", result)
+
+
+
+
+    # Function to server mute or unmute everyone in a voice channel
+    @voice.command(name='mute-all')
+    @commands.has_permissions(mute_members=True)
+    async def mute_all(self, ctx, channel: VoiceChannel, state: str = 'on'):
+
+        state = state.lower()
+        if state not in ('on', 'off'):
+            await ctx.send("Please use `on` or `off`.")
+            return
+        mute = state == 'on'
+
+        if not channel.members:
+            await ctx.send(f"{channel.mention} is empty.")
+            return
+
+        async def set_mute(member):
+            # Skip the command author and anyone already in the requested state
+            if member == ctx.author or member.voice is None or member.voice.mute == mute:
+                return False
+            await member.edit(mute=mute, reason=f"mute-all {state} by {ctx.author}")
+
+        result = await self._run(channel, set_mute)
+        await self._send_summary(ctx, f"{'Muted' if mute else 'Unmuted'} {channel.name}", result)
+
+
+
+
+
+    """------------------------------ Error Handlers ------------------------------"""
+
+    @move_all.error
+    @disconnect_all.error
+    @mute_all.error
+    async def voice_command_error(self, ctx, error):
+        if isinstance(error, commands.MissingPermissions):
+            await ctx.send("You don't have permission to use this command.")
+        elif isinstance(error, (commands.ChannelNotFound, commands.BadUnionArgument)):
+            await ctx.send("Voice channel not found. Please provide a valid mention, ID or name.")
+        elif isinstance(error, commands.MissingRequiredArgument):
+            await ctx.send(f"Usage: `!voice {ctx.command.name} {ctx.command.signature}`")
+        elif isinstance(error, commands.BadArgument):
+            await ctx.send("Please provide valid voice channels.")
+
+
+
+
+
+
+
+# Function to add the cog to the bot
+async def setup(bot):
+    await bot.add_cog(VoiceCommands(bot))
@@ -1,5 +1,44 @@
 # Loads the bot and runs it
-from bot.bot_client import bot
+# utils.startup is imported first so its clock starts as close to process start as possible
+from utils import startup
+import argparse
+import asyncio
+import sys
+import time
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="DracoX Discord bot")
+    parser.add_argument('--import-profile', action='store_true', help="print per-module import cost and exit")
+    parser.add_argument('--check-startup', action='store_true', help="run setup_hook without connecting and fail if startup exceeds the configured budget")
+    args = parser.parse_args()
+
+    if args.import_profile:
+        print(startup.format_import_profile(startup.import_profile()))
+        return 0
+
+    start = time.perf_counter()
+    from bot.bot_client import bot, setup_logging
+    import_ms = (time.perf_counter() - start) * 1000
+
+    if not args.check_startup:
+        bot.run_bot()
+        return 0
+
+    # Startup regression check, meant for CI and pre-deploy hooks
+    from utils.config import Config
+
+    setup_logging(log_file=None)
+    setup_hook_ms = asyncio.run(bot.startup_check())
+    measured = {"import_ms": import_ms, "setup_hook_ms": setup_hook_ms}
+    print(f"import: {import_ms:.0f}ms, setup_hook: {setup_hook_ms:.0f}ms after process start")
+
+    failures = startup.check_budget(measured, Config().get('startup_budget'))
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
 
 if __name__ == "__main__":
-    bot.run_bot()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+from array import array
+
+from utils.sqlite_thread import SQLiteThread
+
+
+logger = logging.getLogger('bot.activity')
+
+
+DEFAULT_PATH = 'data/activity.db'
+DEFAULT_FLUSH_INTERVAL = 60
+
+HOUR = 3600
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activity (
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    hour INTEGER NOT NULL,
+    messages INTEGER NOT NULL DEFAULT 0,
+    voice_seconds INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, user_id, channel_id, hour)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS activity_guild_hour ON activity (guild_id, hour);
+CREATE INDEX IF NOT EXISTS activity_channel_hour ON activity (channel_id, hour);
+"""
+
+
+
+
+# Function to get the start of the hour bucket a timestamp falls in
+def hour_bucket(timestamp):
+
+    return int(timestamp) // HOUR * HOUR
+
+
+
+
+
+
+class ActivityCounters:
+    """
+    Hour-bucketed activity counters held in memory
+    Each (guild, user, channel, hour) key owns one slot in a pair of flat arrays, so
+    counting a message is a dict lookup and an integer increment
+    """
+
+
+
+    def __init__(self):
+
+        self.slots = {}                  # (guild_id, user_id, channel_id, hour) -> slot index
+        self.messages = array('Q')
+        self.voice_seconds = array('Q')
+
+
+
+
+    def __len__(self):
+
+        return len(self.slots)
+
+
+
+
+    def _slot(self, key):
+
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slots[key] = len(self.messages)
+            self.messages.append(0)
+            self.voice_seconds.append(0)
+        return slot
+
+
+
+
+    def add_message(self, guild_id, user_id, channel_id, timestamp, count=1):
+
+        self.messages[self._slot((guild_id, user_id, channel_id, hour_bucket(timestamp)))] += count
+
+
+
+
+    # Function to credit voice time, split across every hour bucket the interval touches
+    def add_voice(self, guild_id, user_id, channel_id, start, end):
+
+        start, end = int(start), int(end)
+        while start < end:
+            bucket = hour_bucket(start)
+            chunk_end = min(end, bucket + HOUR)
+            self.voice_seconds[self._slot((guild_id, user_id, channel_id, bucket))] += chunk_end - start
+            start = chunk_end
+
+
+
+
+    # Function to return the counts as (guild_id, user_id, channel_id, hour, messages, voice_seconds) rows
+    def rows(self):
+
+        messages, voice_seconds = self.messages, self.voice_seconds
+        return [key + (messages[slot], voice_seconds[slot]) for key, slot in self.slots.items()]
+
+
+
+
+
+
+class ActivityStore:
+    """SQLite store the counters are flushed into, with read-side rollup queries"""
+
+
+
+    def __init__(self, path=DEFAULT_PATH):
+
+        self.path = path
+        self.counters = ActivityCounters()
+        self._db = SQLiteThread(path, SCHEMA, 'activity')
+        self._flush_lock = asyncio.Lock()
+
+
+
+
+    async def open(self):
+
+        await self._db.open()
+
+
+
+
+    # Function to swap out the live counters and write them to disk in one transaction
+    async def flush(self):
+
+        async with self._flush_lock:
+            counters, self.counters = self.counters, ActivityCounters()
+            if not len(counters):
+                return 0
+
+            rows = counters.rows()
+            try:
+                await self._db.run(self._write, rows)
+            except Exception as e:
+                logger.error(f"Error flushing {len(rows)} activity rows, keeping them for the next flush: {e}")
+                for guild_id, user_id, channel_id, hour, messages, voice_seconds in rows:
+                    slot = self.counters._slot((guild_id, user_id, channel_id, hour))
+                    self.counters.messages[slot] += messages
+                    self.counters.voice_seconds[slot] += voice_seconds
+                return 0
+
+            return len(rows)
+
+
+    def _write(self, rows):
+
+        with self._db.conn:
+            self._db.conn.executemany(
+                """INSERT INTO activity (guild_id, user_id, channel_id, hour, messages, voice_seconds)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (guild_id, user_id, channel_id, hour) DO UPDATE SET
+                       messages = messages + excluded.messages,
+                       voice_seconds = voice_seconds + excluded.voice_seconds""",
+                rows
+            )
+
+
+
+
+    # Function to rank users in a guild by messages or voice seconds since a timestamp
+    async def leaderboard(self, guild_id, since, metric='messages', limit=10):
+
+        if metric not in ('messages', 'voice_seconds'):
+            raise ValueError(f"Unknown activity metric: {metric}")
+        return await self._db.run(self._leaderboard, guild_id, hour_bucket(since), metric, limit)
+
+
+    def _leaderboard(self, guild_id, since, metric, limit):
+
+        return self._db.conn.execute(
+            f"""SELECT user_id, SUM({metric}) AS total FROM activity
+                WHERE guild_id = ? AND hour >= ?
+                GROUP BY user_id HAVING total > 0
+                ORDER BY total DESC LIMIT ?""",
+            (guild_id, since, limit)
+        ).fetchall()
+
+
+
+
+    # Function to get message counts per bucket for a guild, or one channel of it, since a timestamp
+    async def timeline(self, guild_id, since, channel_id=None, bucket=HOUR):
+
+        return await self._db.run(self._timeline, guild_id, hour_bucket(since), channel_id, bucket)
+
+
+    def _timeline(self, guild_id, since, channel_id, bucket):
+
+        query = "SELECT hour / ? * ? AS bucket, SUM(messages) FROM activity WHERE guild_id = ? AND hour >= ?"
+        params = [bucket, bucket, guild_id, since]
+        if channel_id is not None:
+            query += " AND channel_id = ?"
+            params.append(channel_id)
+        query += " GROUP BY bucket ORDER BY bucket"
+        return dict(self._db.conn.execute(query, params).fetchall())
+
+
+
+
+    async def close(self):
+
+        await self.flush()
+        await self._db.close()
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+import discord
+
+
+logger = logging.getLogger('bot.fanout')
+
+
+DEFAULT_CONCURRENCY = 5
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+
+
+
+
+# Function to decide whether a failed API call is worth retrying
+def is_transient(error):
+
+    if isinstance(error, discord.HTTPException):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientError, OSError))
+
+
+
+
+
+
+class FanOutResult:
+    """Outcome of running one operation over many items"""
+
+    def __init__(self):
+        self.succeeded = []
+        self.skipped = []
+        self.failed = []     # (item, error) pairs
+        self.retries = 0
+        self.elapsed = 0.0
+
+    @property
+    def total(self):
+        return len(self.succeeded) + len(self.skipped) + len(self.failed)
+
+
+
+
+
+
+"""
+Function to run an async operation over many items through a bounded pool of workers
+The operation returns False to mark an item as skipped. Transient failures (5xx, 429,
+timeouts, connection errors) are retried with exponential backoff; anything else fails
+the item straight away. discord.py still applies its own per-route rate limit buckets,
+the pool just keeps us from queueing hundreds of requests behind them at once
+"""
+async def fan_out(items, operation, concurrency=DEFAULT_CONCURRENCY, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+
+    result = FanOutResult()
+    queue = asyncio.Queue()
+    for item in items:
+        queue.put_nowait(item)
+
+    async def worker():
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            for attempt in range(retries + 1):
+                try:
+                    outcome = await operation(item)
+                except Exception as e:
+                    if attempt < retries and is_transient(e):
+                        result.retries += 1
+                        await asyncio.sleep(backoff * 2 ** attempt)
+                        continue
+                    logger.warning(f"Fan-out operation failed for {item}: {e}")
+                    result.failed.append((item, e))
+                else:
+                    (result.skipped if outcome is False else result.succeeded).append(item)
+                break
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, queue.qsize())))))
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -1,4 +1,4 @@
-import discord
+import asyncio
 import re
 import logging
 from datetime import datetime, timedelta
@@ -6,6 +6,9 @@ from datetime import datetime, timedelta
 
 logger = logging.getLogger('bot.helpers')
 
+# Log channel sends that have been queued but not finished, flushed on shutdown
+pending_log_sends = set()
+
 
 
 
@@ -47,18 +50,36 @@ def parse_time(time_str):
 
 
 
+# Function to parse a relative duration such as 30m, 12h, 7d or 2w into seconds
+def parse_duration(duration_str):
+
+    match = re.fullmatch(r'(\d+)\s*([smhdw])', duration_str.strip().lower())
+    if not match:
+        return None
+
+    amount, unit = match.groups()
+    multipliers = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+    return int(amount) * multipliers[unit]
+
+
+
+
+
 
 
 
 
 
 # Function to create an embed
-def create_embed(title, description=None, color=discord.Color.blue(), fields=None, footer=None, thumbnail=None):
+def create_embed(title, description=None, color=None, fields=None, footer=None, thumbnail=None):
+
+    # discord is imported here rather than at module level so the time helpers stay cheap to import
+    import discord
 
     embed = discord.Embed(
         title=title,
         description=description,
-        color=color,
+        color=color if color is not None else discord.Color.blue(),
         timestamp=datetime.now()
     )
     
@@ -85,6 +106,7 @@ def create_embed(title, description=None, color=discord.Color.blue(), fields=Non
 # Function to log to channel
 def log_to_channel(bot, guild_id, message, level="INFO"):
 
+    import discord
     from utils.config import Config
     config = Config()
     
@@ -113,8 +135,38 @@ def log_to_channel(bot, guild_id, message, level="INFO"):
     )
     
     try:
-        bot.loop.create_task(log_channel.send(embed=embed))
+        queue_log_send(log_channel, embed)
         return True
     except Exception as e:
         logger.error(f"Error logging to channel: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+
+
+
+# Function to send a log embed in the background, tracked so shutdown can wait for it
+def queue_log_send(channel, embed):
+
+    async def send():
+        try:
+            await channel.send(embed=embed)
+        except Exception as e:
+            logger.error(f"Error sending log message: {e}")
+
+    task = asyncio.get_running_loop().create_task(send())
+    pending_log_sends.add(task)
+    task.add_done_callback(pending_log_sends.discard)
+    return task
+
+
+
+
+
+# Function to wait for queued log sends to finish, returns how many were still pending at the deadline
+async def flush_log_sends(timeout=10):
+
+    if not pending_log_sends:
+        return 0
+    done, pending = await asyncio.wait(set(pending_log_sends), timeout=timeout)
+    return len(pending)
\ No newline at end of file
@@ -0,0 +1,454 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+from multidict import CIMultiDict
+from yarl import URL
+
+from utils.lru import LRUCache
+
+
+logger = logging.getLogger('bot.http')
+
+
+DEFAULT_LIMIT = 50
+DEFAULT_LIMIT_PER_HOST = 8
+DEFAULT_TIMEOUT = 15
+DEFAULT_CACHE_BYTES = 16 * 1024 * 1024
+DEFAULT_DISK_BYTES = 256 * 1024 * 1024
+USER_AGENT = "DracoX (https://github.com/Jesse-11/DracoX)"
+
+# Rough per-entry cost on top of the body (headers, validators, bookkeeping)
+ENTRY_OVERHEAD = 512
+
+# Response headers kept with cached entries
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Expires', 'Date', 'Vary')
+
+# Request headers that change what a server sends back, so they are part of the cache key
+KEYED_HEADERS = ('Accept', 'Accept-Language', 'Accept-Encoding')
+
+
+
+
+# Function to work out how long a response may be served from cache, None means do not store it
+def freshness(headers, now=None):
+
+    now = time.time() if now is None else now
+    directives = {}
+    for part in headers.get('Cache-Control', '').split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"')
+
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0
+
+    for name in ('s-maxage', 'max-age'):
+        if name in directives:
+            try:
+                return max(0, int(directives[name]))
+            except ValueError:
+                return 0
+
+    if 'Expires' in headers:
+        try:
+            return max(0, parsedate_to_datetime(headers['Expires']).timestamp() - now)
+        except (TypeError, ValueError):
+            return 0
+
+    # No explicit lifetime; still worth keeping if we can revalidate it
+    if 'ETag' in headers or 'Last-Modified' in headers:
+        return 0
+    return None
+
+
+
+
+# Function to build the cache key for a GET from its URL and the request headers that shape the reply
+def cache_key(url, headers):
+
+    parts = [str(url)]
+    for name in KEYED_HEADERS:
+        if name in headers:
+            parts.append(f"{name.lower()}: {headers[name]}")
+    return '\n'.join(parts)
+
+
+
+
+# Function to name a cache entry's files on disk
+def disk_digest(key):
+
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+
+
+# Function to pick out the request header values a response varies on, None if it cannot be cached
+def vary_values(response_headers, request_headers):
+
+    names = [name.strip() for name in response_headers.get('Vary', '').split(',') if name.strip()]
+    if '*' in names:
+        return None
+    return {name.lower(): request_headers.get(name) for name in names}
+
+
+
+
+
+
+class HTTPStatusError(aiohttp.ClientError):
+    """Raised by HTTPResponse.raise_for_status for non-2xx replies"""
+
+    def __init__(self, url, status):
+        self.url = url
+        self.status = status
+        super().__init__(f"HTTP {status} for {url}")
+
+
+
+
+
+
+class HTTPResponse:
+    """A fully read HTTP response"""
+
+    __slots__ = ('url', 'status', 'headers', 'body', 'from_cache')
+
+    def __init__(self, url, status, headers, body, from_cache=False):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.from_cache = from_cache
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise HTTPStatusError(self.url, self.status)
+
+    def text(self, encoding='utf-8'):
+        return self.body.decode(encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.body)
+
+
+
+
+
+
+class CacheEntry:
+    """Cached GET response plus the validators needed to revalidate it"""
+
+    __slots__ = ('status', 'headers', 'body', 'expires_at', 'vary')
+
+    def __init__(self, status, headers, body, expires_at, vary=None):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.expires_at = expires_at
+        self.vary = vary or {}   # lowercased request header -> value this copy was fetched with
+
+    @property
+    def size(self):
+        return ENTRY_OVERHEAD + len(self.body)
+
+    def validators(self):
+        headers = {}
+        if 'ETag' in self.headers:
+            headers['If-None-Match'] = self.headers['ETag']
+        if 'Last-Modified' in self.headers:
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+    # Function to check a request asks for the same variant this entry holds
+    def matches(self, request_headers):
+        return all(request_headers.get(name) == value for name, value in self.vary.items())
+
+
+
+
+
+
+class HTTPClient:
+    """
+    Bot-wide async HTTP client
+    One keep-alive connection pool shared by every cog, with per-host concurrency limits,
+    timeouts and an optional response cache (memory, plus disk if cache_dir is set) that
+    honours Cache-Control, Expires, ETag, Last-Modified and Vary. Both cache tiers are
+    size-bounded and evict least recently used entries first
+    """
+
+
+
+    def __init__(
+        self,
+        limit=DEFAULT_LIMIT,
+        limit_per_host=DEFAULT_LIMIT_PER_HOST,
+        host_limits=None,
+        timeout=DEFAULT_TIMEOUT,
+        cache_bytes=DEFAULT_CACHE_BYTES,
+        cache_dir=None,
+        disk_bytes=DEFAULT_DISK_BYTES
+    ):
+
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.host_limits = host_limits or {}   # host -> tighter concurrency limit for specific APIs
+        self.timeout = timeout
+        self.cache = LRUCache(cache_bytes) if cache_bytes else None
+        self.cache_dir = cache_dir
+        self.disk = LRUCache(disk_bytes, on_evict=self._evicted) if cache_dir else None   # digest -> digest, sized by bytes on disk
+        self.session = None
+        self._host_semaphores = {}
+        self._disk_evicted = []
+
+
+
+
+    async def start(self):
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Pick up what an earlier run left behind, oldest first, trimming it to the current budget
+            for digest, size in await asyncio.to_thread(self._scan_disk):
+                if not self.disk.set(digest, digest, size):
+                    self._disk_evicted.append(digest)
+            await self._remove_evicted()
+
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            ),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'User-Agent': USER_AGENT}
+        )
+
+
+
+
+    async def close(self):
+
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+            # Give the connector a moment to close its transports cleanly
+            await asyncio.sleep(0)
+
+
+
+
+    def _semaphore(self, host):
+
+        limit = self.host_limits.get(host)
+        if limit is None:
+            return None
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(limit)
+        return semaphore
+
+
+
+
+    # Function to send a request and read the whole body
+    async def request(self, method, url, *, timeout=None, **kwargs):
+
+        if timeout is not None:
+            kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout)
+
+        semaphore = self._semaphore(URL(url).host)
+        if semaphore is None:
+            return await self._send(method, url, **kwargs)
+        async with semaphore:
+            return await self._send(method, url, **kwargs)
+
+
+    async def _send(self, method, url, **kwargs):
+
+        async with self.session.request(method, url, **kwargs) as response:
+            body = await response.read()
+            return HTTPResponse(url, response.status, response.headers, body)
+
+
+
+
+    """
+    Function to GET a URL, served from cache when fresh
+    Stale entries with an ETag or Last-Modified are revalidated with a conditional request,
+    and a 304 reply refreshes the cached copy instead of downloading it again. Requests
+    carrying Authorization are only cached when public=True, i.e. the reply is the same
+    for every caller
+    """
+    async def get(self, url, *, headers=None, use_cache=True, public=False, timeout=None):
+
+        request_headers = CIMultiDict(headers or {})
+        if not use_cache or self.cache is None or ('Authorization' in request_headers and not public):
+            return await self.request('GET', url, headers=headers, timeout=timeout)
+
+        key = cache_key(url, request_headers)
+        entry = self.cache.get(key)
+        if entry is None and self.cache_dir:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                self.cache.set(key, entry, entry.size)
+                self.disk.get(disk_digest(key))
+
+        # A copy fetched for a different variant of a Vary header is no use to this request
+        cached = entry is not None
+        if cached and not entry.matches(request_headers):
+            entry = None
+
+        now = time.time()
+        if entry is not None and entry.expires_at > now:
+            return HTTPResponse(url, entry.status, entry.headers, entry.body, from_cache=True)
+
+        if entry is not None:
+            request_headers.update(entry.validators())
+
+        response = await self.request('GET', url, headers=request_headers, timeout=timeout)
+
+        if response.status == 304 and entry is not None:
+            merged = {**entry.headers, **{name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}}
+            lifetime = freshness(merged, now)
+            entry = CacheEntry(entry.status, merged, entry.body, now + (lifetime or 0), entry.vary)
+            await self._store(key, entry)
+            return HTTPResponse(url, entry.status, entry.headers, entry.body, from_cache=True)
+
+        if response.status == 200:
+            kept = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+            lifetime = freshness(kept, now)
+            vary = vary_values(kept, request_headers)
+            if lifetime is not None and vary is not None:
+                await self._store(key, CacheEntry(200, kept, response.body, now + lifetime, vary))
+            elif cached:
+                self._forget(key)
+
+        return response
+
+
+
+
+    async def _store(self, key, entry):
+
+        self.cache.set(key, entry, entry.size)
+        if self.cache_dir:
+            size = await asyncio.to_thread(self._write_disk, key, entry)
+            if size is not None:
+                digest = disk_digest(key)
+                if not self.disk.set(digest, digest, size):
+                    self._disk_evicted.append(digest)
+                await self._remove_evicted()
+
+
+    def _forget(self, key):
+
+        self.cache.pop(key)
+        if self.cache_dir:
+            digest = disk_digest(key)
+            self.disk.pop(digest)
+            self._remove_disk([digest])
+
+
+
+
+    """------------------------------ Disk cache ------------------------------"""
+
+    def _disk_paths(self, digest):
+
+        base = os.path.join(self.cache_dir, digest)
+        return base + '.json', base + '.body'
+
+
+    def _evicted(self, digest, _):
+
+        self._disk_evicted.append(digest)
+
+
+    async def _remove_evicted(self):
+
+        if self._disk_evicted:
+            digests, self._disk_evicted = self._disk_evicted, []
+            await asyncio.to_thread(self._remove_disk, digests)
+
+
+    def _remove_disk(self, digests):
+
+        for digest in digests:
+            for path in self._disk_paths(digest):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+    # Function to list complete cache entries on disk as (digest, bytes), least recently used first
+    def _scan_disk(self):
+
+        files = {}
+        for item in os.scandir(self.cache_dir):
+            digest, _, suffix = item.name.partition('.')
+            if suffix.endswith('.tmp'):
+                os.remove(item.path)
+                continue
+            stat = item.stat()
+            files.setdefault(digest, {})[suffix] = stat
+
+        entries = []
+        for digest, stats in files.items():
+            if 'json' in stats and 'body' in stats:
+                entries.append((stats['json'].st_mtime, digest, stats['json'].st_size + stats['body'].st_size))
+            else:
+                self._remove_disk([digest])
+        entries.sort()
+        return [(digest, size) for _, digest, size in entries]
+
+
+    def _read_disk(self, key):
+
+        meta_path, body_path = self._disk_paths(disk_digest(key))
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+            # Metadata mtime records last use, so eviction order survives a restart
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get('key') != key:
+            return None
+        return CacheEntry(meta['status'], meta['headers'], body, meta['expires_at'], meta.get('vary'))
+
+
+    # Function to write an entry to disk, returns the bytes it takes up or None on failure
+    def _write_disk(self, key, entry):
+
+        meta_path, body_path = self._disk_paths(disk_digest(key))
+        try:
+            # Body first, so a reader never finds metadata pointing at a missing body
+            with open(body_path + '.tmp', 'wb') as f:
+                f.write(entry.body)
+            os.replace(body_path + '.tmp', body_path)
+            meta = json.dumps({'key': key, 'status': entry.status, 'headers': entry.headers, 'expires_at': entry.expires_at, 'vary': entry.vary})
+            with open(meta_path + '.tmp', 'w') as f:
+                f.write(meta)
+            os.replace(meta_path + '.tmp', meta_path)
+        except OSError as e:
+            logger.warning(f"Error writing HTTP cache entry for {key}: {e}")
+            return None
+        return len(entry.body) + len(meta.encode())
@@ -0,0 +1,86 @@
+from collections import OrderedDict
+
+
+
+
+class LRUCache:
+    """Least-recently-used cache bounded by the total size of its values in bytes"""
+
+
+
+    def __init__(self, max_bytes, on_evict=None):
+
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict   # called with (key, value) for entries pushed out by set()
+        self.bytes = 0
+        self._items = OrderedDict()   # key -> (value, size), least recently used first
+        self.hits = 0
+        self.misses = 0
+
+
+
+
+    def __len__(self):
+
+        return len(self._items)
+
+
+
+
+    def __contains__(self, key):
+
+        return key in self._items
+
+
+
+
+    def get(self, key, default=None):
+
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+
+
+
+    # Function to store a value, size defaults to len(value) for bytes-like values
+    def set(self, key, value, size=None):
+
+        if size is None:
+            size = len(value)
+        if size > self.max_bytes:
+            return False
+
+        self.pop(key)
+        self._items[key] = (value, size)
+        self.bytes += size
+
+        while self.bytes > self.max_bytes:
+            evicted_key, (evicted, evicted_size) = self._items.popitem(last=False)
+            self.bytes -= evicted_size
+            if self.on_evict is not None:
+                self.on_evict(evicted_key, evicted)
+        return True
+
+
+
+
+    def pop(self, key, default=None):
+
+        item = self._items.pop(key, None)
+        if item is None:
+            return default
+        self.bytes -= item[1]
+        return item[0]
+
+
+
+
+    def clear(self):
+
+        self._items.clear()
+        self.bytes = 0
@@ -0,0 +1,329 @@
+import bisect
+import heapq
+import itertools
+import logging
+import re
+
+from discord.ext import commands
+
+
+logger = logging.getLogger('bot.member_index')
+
+
+# Where a name came from, lower ranks win ties (nick > global name > username)
+SOURCE_NICK = 0
+SOURCE_GLOBAL = 1
+SOURCE_USERNAME = 2
+
+# How far a prefix or n-gram lookup may scan before giving up on finding more
+MAX_PREFIX_SCAN = 200
+MAX_GRAM_CANDIDATES = 2000
+
+GRAM_SIZE = 3
+
+# Keys merged per step when combining the runs loaded while building
+MERGE_SLICE = 20000
+
+MENTION_OR_ID = re.compile(r'^(<@!?)?([0-9]{15,20})>?$')
+
+
+
+
+# Function to normalise a name for case-insensitive matching
+def normalise(name):
+
+    if not name:
+        return None
+    return name.casefold().lstrip('@').strip()
+
+
+
+
+# Function to split a name into the n-grams used for substring lookups
+def ngrams(name):
+
+    if len(name) < GRAM_SIZE:
+        return set()
+    return {name[i:i + GRAM_SIZE] for i in range(len(name) - GRAM_SIZE + 1)}
+
+
+
+
+# Function to pull the indexable names off a member
+def member_names(member):
+
+    names = []
+    for source, value in (
+        (SOURCE_NICK, getattr(member, 'nick', None)),
+        (SOURCE_GLOBAL, getattr(member, 'global_name', None)),
+        (SOURCE_USERNAME, getattr(member, 'name', None)),
+    ):
+        key = normalise(value)
+        if key:
+            names.append((key, source))
+    return tuple(names)
+
+
+
+
+
+
+class MemberIndex:
+    """Name index over a single guild's members"""
+
+
+
+    def __init__(self):
+
+        self._keys = []    # sorted (name, member_id, source) entries for prefix lookups
+        self._names = {}   # member_id -> indexed (name, source) pairs
+        self._grams = {}   # n-gram -> set of member ids for substring lookups
+        self._runs = []    # sorted key runs waiting to be merged while building
+        self._merging = None
+
+
+
+
+    def __len__(self):
+
+        return len(self._names)
+
+
+
+
+    def __contains__(self, member_id):
+
+        return member_id in self._names
+
+
+
+
+    # Function to (re)build the index from a full member list in one pass
+    def build(self, members):
+
+        self.reset()
+        self.extend(members)
+        self.finish()
+
+
+
+
+    def reset(self):
+
+        self._keys = []
+        self._names = {}
+        self._grams = {}
+        self._runs = []
+        self._merging = None
+
+
+
+
+    """
+    Function to bulk-load members while building
+    Each call adds one sorted run of keys; finish() must run before the index is searched
+    or updated. This lets a large guild be loaded in chunks between event loop ticks
+    """
+    def extend(self, members):
+
+        run = []
+        for member in members:
+            names = member_names(member)
+            if not names:
+                continue
+            self._names[member.id] = names
+            for key, source in names:
+                run.append((key, member.id, source))
+            self._add_grams(member.id, names)
+
+        run.sort()
+        self._runs.append(run)
+
+
+
+
+    # Function to merge the next slice of the pending runs, returns whether more merging is left
+    def merge_step(self, size=MERGE_SLICE):
+
+        if self._merging is None:
+            if len(self._runs) < 2:
+                return False
+            self._merging = heapq.merge(*self._runs)
+            self._runs = [[]]
+
+        merged = self._runs[0]
+        before = len(merged)
+        merged.extend(itertools.islice(self._merging, size))
+        if len(merged) - before < size:
+            self._merging = None
+            return False
+        return True
+
+
+
+
+    def finish(self):
+
+        while self.merge_step():
+            pass
+        self._keys = self._runs.pop() if self._runs else []
+
+
+
+
+    # Function to add a member, replacing any previously indexed names
+    def add(self, member):
+
+        names = member_names(member)
+        if self._names.get(member.id) == names:
+            return
+
+        self.remove(member.id)
+        if not names:
+            return
+
+        self._names[member.id] = names
+        for key, source in names:
+            bisect.insort(self._keys, (key, member.id, source))
+        self._add_grams(member.id, names)
+
+
+
+
+    # Function to re-index a member after a name, nick or global name change
+    def update(self, member):
+
+        self.add(member)
+
+
+
+
+    # Function to drop a member from the index
+    def remove(self, member_id):
+
+        names = self._names.pop(member_id, None)
+        if not names:
+            return
+
+        for key, source in names:
+            entry = (key, member_id, source)
+            i = bisect.bisect_left(self._keys, entry)
+            if i < len(self._keys) and self._keys[i] == entry:
+                del self._keys[i]
+
+        for gram in set().union(*(ngrams(key) for key, _ in names)):
+            bucket = self._grams.get(gram)
+            if bucket is None:
+                continue
+            bucket.discard(member_id)
+            if not bucket:
+                del self._grams[gram]
+
+
+
+
+    def _add_grams(self, member_id, names):
+
+        for gram in set().union(*(ngrams(key) for key, _ in names)):
+            self._grams.setdefault(gram, set()).add(member_id)
+
+
+
+
+    """
+    Function to look up members by name
+    Returns (member_id, score) pairs best first, where a lower score is a better match:
+    (match kind, extra characters, name source) with kind 0 = exact, 1 = prefix, 2 = substring
+    """
+    def search(self, query, limit=5):
+
+        query = normalise(query)
+        if not query:
+            return []
+
+        best = {}
+
+        def consider(member_id, score):
+            if member_id not in best or score < best[member_id]:
+                best[member_id] = score
+
+        # Exact and prefix matches straight off the sorted key list
+        i = bisect.bisect_left(self._keys, (query,))
+        end = min(len(self._keys), i + MAX_PREFIX_SCAN)
+        while i < end:
+            key, member_id, source = self._keys[i]
+            if not key.startswith(query):
+                break
+            consider(member_id, (0 if key == query else 1, len(key) - len(query), source))
+            i += 1
+
+        # Substring matches through the n-gram buckets, smallest bucket first
+        if len(best) < limit:
+            grams = ngrams(query)
+            if grams:
+                buckets = sorted((self._grams.get(gram, ()) for gram in grams), key=len)
+                if buckets[0]:
+                    candidates = set(buckets[0])
+                    for bucket in buckets[1:]:
+                        candidates &= bucket
+                        if not candidates:
+                            break
+
+                    for member_id in list(candidates)[:MAX_GRAM_CANDIDATES]:
+                        if member_id in best:
+                            continue
+                        for key, source in self._names[member_id]:
+                            if query in key:
+                                consider(member_id, (2, len(key) - len(query), source))
+
+        ranked = sorted(best.items(), key=lambda item: (item[1], item[0]))
+        return ranked[:limit]
+
+
+
+
+
+
+class AmbiguousMember(commands.BadArgument):
+    """Raised when a name is not an exact match for exactly one member, carrying the ranked candidates"""
+
+    def __init__(self, argument, members):
+        self.argument = argument
+        self.members = members
+        names = ", ".join(str(member) for member in members)
+        super().__init__(f'"{argument}" does not pick out a single member. Closest matches: {names}. Please use their full name or a mention.')
+
+
+
+
+
+
+class FuzzyMember(commands.MemberConverter):
+    """Member converter that resolves names through the guild's member index"""
+
+
+
+    async def convert(self, ctx, argument):
+
+        # Mentions, IDs and anything we have not indexed go through the normal converter
+        indexes = getattr(ctx.bot, 'member_indexes', None)
+        index = indexes.get(ctx.guild.id) if indexes is not None and ctx.guild else None
+        if index is None or MENTION_OR_ID.match(argument):
+            return await super().convert(ctx, argument)
+
+        matches = []
+        for member_id, score in index.search(argument, limit=5):
+            member = ctx.guild.get_member(member_id)
+            if member is not None:
+                matches.append((member, score))
+
+        if not matches:
+            raise commands.MemberNotFound(argument)
+
+        # These back kick/ban/timeout, so only a single exact name match resolves without asking;
+        # a lone prefix or substring hit may just be what the scan caps happened to keep
+        exact = [member for member, score in matches if score[0] == 0]
+        if len(exact) == 1:
+            return exact[0]
+
+        raise AmbiguousMember(argument, exact or [member for member, _ in matches])
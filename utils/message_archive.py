@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import sqlite3
+import time
+
+from utils.sqlite_thread import SQLiteThread
+
+
+logger = logging.getLogger('bot.archive')
+
+
+DEFAULT_PATH = 'data/archive.db'
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_QUEUE_SIZE = 50000
+DEFAULT_RETENTION_DAYS = 90
+
+# Rows removed per transaction while pruning, so a large prune never holds the writer for long
+PRUNE_CHUNK = 5000
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    author_id INTEGER NOT NULL,
+    created_at INTEGER NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_guild_time ON messages (guild_id, created_at);
+CREATE INDEX IF NOT EXISTS messages_time ON messages (created_at);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content,
+    content='messages',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+"""
+
+
+
+
+# Function to turn free text into an FTS5 query that matches every word, ignoring FTS syntax
+def build_match_query(text):
+
+    terms = [term.replace('"', '""') for term in text.split()]
+    return ' '.join(f'"{term}"' for term in terms if term)
+
+
+
+
+
+
+class MessageArchive:
+    """
+    Full-text message archive backed by SQLite FTS5
+    Messages are queued from the event loop and written in batched transactions by a
+    background task; all database work runs on one dedicated thread
+    """
+
+
+
+    def __init__(self, path=DEFAULT_PATH, batch_size=DEFAULT_BATCH_SIZE, queue_size=DEFAULT_QUEUE_SIZE, retention_days=DEFAULT_RETENTION_DAYS):
+
+        self.path = path
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+
+        self._queue = asyncio.Queue(maxsize=queue_size)
+        self._db = SQLiteThread(path, SCHEMA, 'archive')
+        self._writer_task = None
+        self.dropped = 0
+
+
+
+
+    # Function to open the database and start the background writer
+    async def start(self):
+
+        try:
+            await self._db.open()
+        except sqlite3.OperationalError as e:
+            raise RuntimeError(f"SQLite build does not support FTS5: {e}") from e
+        self._writer_task = asyncio.create_task(self._writer())
+        logger.info(f"Message archive opened at {self.path}")
+
+
+
+
+    # Function to queue a message for archiving, never blocks the event loop
+    def push(self, message):
+
+        row = (
+            message.id,
+            message.guild.id,
+            message.channel.id,
+            message.author.id,
+            int(message.created_at.timestamp()),
+            message.content
+        )
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Archive queue full, {self.dropped} messages dropped so far")
+
+
+
+
+    # Function to drain the queue into the database, one transaction per batch
+    async def _writer(self):
+
+        while True:
+            row = await self._queue.get()
+            if row is None:
+                self._queue.task_done()
+                return
+
+            batch = [row]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                batch.append(row)
+
+            try:
+                await self._db.run(self._write_batch, batch)
+            except Exception as e:
+                logger.error(f"Error writing {len(batch)} archived messages: {e}")
+
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+
+    def _write_batch(self, rows):
+
+        with self._db.conn:
+            self._db.conn.executemany(
+                "INSERT OR IGNORE INTO messages (id, guild_id, channel_id, author_id, created_at, content) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+
+
+
+    """
+    Function to search the archive
+    Returns (total matches, rows) where rows are (message_id, channel_id, author_id, created_at, snippet)
+    ranked by relevance
+    """
+    async def search(self, guild_id, text, author_id=None, channel_id=None, since=None, limit=10, offset=0):
+
+        match = build_match_query(text)
+        if not match:
+            return 0, []
+        return await self._db.run(self._search, guild_id, match, author_id, channel_id, since, limit, offset)
+
+
+    def _search(self, guild_id, match, author_id, channel_id, since, limit, offset):
+
+        where = ["messages_fts MATCH ?", "m.guild_id = ?"]
+        params = [match, guild_id]
+        if author_id is not None:
+            where.append("m.author_id = ?")
+            params.append(author_id)
+        if channel_id is not None:
+            where.append("m.channel_id = ?")
+            params.append(channel_id)
+        if since is not None:
+            where.append("m.created_at >= ?")
+            params.append(int(since))
+        clause = " AND ".join(where)
+
+        total = self._db.conn.execute(
+            f"SELECT COUNT(*) FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid WHERE {clause}",
+            params
+        ).fetchone()[0]
+
+        rows = self._db.conn.execute(
+            f"""SELECT m.id, m.channel_id, m.author_id, m.created_at,
+                       snippet(messages_fts, 0, '**', '**', '…', 16)
+                FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid
+                WHERE {clause}
+                ORDER BY bm25(messages_fts), m.id DESC
+                LIMIT ? OFFSET ?""",
+            params + [limit, offset]
+        ).fetchall()
+
+        return total, rows
+
+
+
+
+    # Function to delete messages older than the retention window, returns rows removed
+    async def prune(self):
+
+        cutoff = int(time.time()) - self.retention_days * 86400
+        removed = 0
+        while True:
+            count = await self._db.run(self._prune_chunk, cutoff)
+            removed += count
+            if count < PRUNE_CHUNK:
+                break
+        if removed:
+            logger.info(f"Pruned {removed} archived messages older than {self.retention_days} days")
+        return removed
+
+
+    def _prune_chunk(self, cutoff):
+
+        with self._db.conn:
+            cursor = self._db.conn.execute(
+                "DELETE FROM messages WHERE id IN (SELECT id FROM messages WHERE created_at < ? LIMIT ?)",
+                (cutoff, PRUNE_CHUNK)
+            )
+        return cursor.rowcount
+
+
+
+
+    # Function to wait until everything queued so far has been written
+    async def flush(self):
+
+        if self._writer_task is not None and not self._writer_task.done():
+            await self._queue.join()
+
+
+
+
+    # Function to write everything still queued and close the database
+    async def close(self):
+
+        if self._writer_task is not None:
+            await self._queue.put(None)
+            await self._writer_task
+            self._writer_task = None
+
+        await self._db.close()
+        logger.info("Message archive closed")
@@ -0,0 +1,268 @@
+import logging
+from collections import OrderedDict
+
+
+logger = logging.getLogger('bot.message_cache')
+
+
+DEFAULT_PER_CHANNEL = 200
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+DEFAULT_CONTENT_LIMIT = 300
+
+# Rough per-record cost on top of the content itself (object header, slots, ints)
+RECORD_OVERHEAD = 160
+
+# Rough per-channel cost of an empty ring (ring object, channel id, OrderedDict entry),
+# plus the cost of each slot as the ring grows towards its capacity
+RING_OVERHEAD = 256
+SLOT_OVERHEAD = 8
+
+
+
+
+# Function to cut message content down to what we keep for auditing
+def truncate(content, limit):
+
+    if content is None:
+        return ''
+    if len(content) <= limit:
+        return content
+    return content[:limit - 1] + '…'
+
+
+
+
+
+
+class CachedMessage:
+    """Compact record of a message kept for delete/edit auditing"""
+
+    __slots__ = ('id', 'channel_id', 'guild_id', 'author_id', 'content', 'attachments')
+
+    def __init__(self, id, channel_id, guild_id, author_id, content, attachments=0):
+        self.id = id
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.author_id = author_id
+        self.content = content
+        self.attachments = attachments
+
+    @property
+    def size(self):
+        return RECORD_OVERHEAD + len(self.content)
+
+
+
+
+
+
+class ChannelRing:
+    """
+    Fixed-capacity ring buffer of the most recent messages in one channel
+    Slots are grown on demand up to capacity, so a quiet channel only pays for what it holds
+    """
+
+    __slots__ = ('slots', 'capacity', 'head', 'count', 'bytes')
+
+    def __init__(self, capacity):
+        self.slots = []
+        self.capacity = capacity
+        self.head = 0                  # next slot to write
+        self.count = 0                 # live records in the ring
+        self.bytes = RING_OVERHEAD     # estimated size of the ring and its live records
+
+
+
+
+    # Function to append a record, overwriting the oldest one when full
+    # Returns the change in estimated bytes
+    def append(self, record):
+
+        delta = record.size
+        if len(self.slots) < self.capacity:
+            self.slots.append(record)
+            self.count += 1
+            delta += SLOT_OVERHEAD
+        else:
+            old = self.slots[self.head]
+            if old is None:
+                self.count += 1
+            else:
+                delta -= old.size
+            self.slots[self.head] = record
+
+        self.head = (self.head + 1) % self.capacity
+        self.bytes += delta
+        return delta
+
+
+
+
+    # Function to find the slot holding a message, searching newest first
+    def _find(self, message_id):
+
+        capacity = len(self.slots)
+        for step in range(1, capacity + 1):
+            i = (self.head - step) % capacity
+            record = self.slots[i]
+            if record is not None and record.id == message_id:
+                return i
+        return None
+
+
+
+
+    def get(self, message_id):
+
+        i = self._find(message_id)
+        return None if i is None else self.slots[i]
+
+
+
+
+    # Function to remove a record, returns (record, change in estimated bytes)
+    def pop(self, message_id):
+
+        i = self._find(message_id)
+        if i is None:
+            return None, 0
+
+        record = self.slots[i]
+        self.slots[i] = None
+        self.count -= 1
+        self.bytes -= record.size
+        return record, -record.size
+
+
+
+
+    # Function to replace a record's content, returns (old content, change in estimated bytes)
+    def edit(self, message_id, content):
+
+        i = self._find(message_id)
+        if i is None:
+            return None, 0
+
+        record = self.slots[i]
+        before = record.content
+        record.content = content
+        delta = len(content) - len(before)
+        self.bytes += delta
+        return before, delta
+
+
+
+
+
+
+class MessageCache:
+    """
+    Per-channel ring buffers under one global memory budget
+    Channels are kept in least-recently-active order, so when the budget is exceeded
+    the quietest channels are dropped first
+    """
+
+
+
+    def __init__(self, per_channel=DEFAULT_PER_CHANNEL, max_bytes=DEFAULT_MAX_BYTES, content_limit=DEFAULT_CONTENT_LIMIT):
+
+        self.per_channel = per_channel
+        self.max_bytes = max_bytes
+        self.content_limit = content_limit
+        self.channels = OrderedDict()   # channel_id -> ChannelRing, oldest activity first
+        self.bytes = 0
+
+
+
+
+    def __len__(self):
+
+        return sum(ring.count for ring in self.channels.values())
+
+
+
+
+    # Function to record a new message
+    def add(self, message):
+
+        record = CachedMessage(
+            id=message.id,
+            channel_id=message.channel.id,
+            guild_id=message.guild.id if message.guild else None,
+            author_id=message.author.id,
+            content=truncate(message.content, self.content_limit),
+            attachments=len(message.attachments)
+        )
+
+        ring = self.channels.get(record.channel_id)
+        if ring is None:
+            ring = self.channels[record.channel_id] = ChannelRing(self.per_channel)
+            self.bytes += ring.bytes
+        else:
+            self.channels.move_to_end(record.channel_id)
+
+        self.bytes += ring.append(record)
+        self._evict()
+        return record
+
+
+
+
+    def get(self, channel_id, message_id):
+
+        ring = self.channels.get(channel_id)
+        return ring.get(message_id) if ring else None
+
+
+
+
+    # Function to remove and return a message's record, if we still have it
+    def pop(self, channel_id, message_id):
+
+        ring = self.channels.get(channel_id)
+        if ring is None:
+            return None
+
+        record, delta = ring.pop(message_id)
+        self.bytes += delta
+        if ring.count == 0:
+            del self.channels[channel_id]
+            self.bytes -= ring.bytes
+        return record
+
+
+
+
+    # Function to update a message's content, returns the previous content or None if not cached
+    def edit(self, channel_id, message_id, content):
+
+        ring = self.channels.get(channel_id)
+        if ring is None:
+            return None
+
+        before, delta = ring.edit(message_id, truncate(content, self.content_limit))
+        self.bytes += delta
+        self._evict()
+        return before
+
+
+
+
+    # Function to forget a whole channel (deleted channel, left guild)
+    def drop_channel(self, channel_id):
+
+        ring = self.channels.pop(channel_id, None)
+        if ring is not None:
+            self.bytes -= ring.bytes
+
+
+
+
+    # Function to drop the least recently active channels until we are back under budget
+    def _evict(self):
+
+        # Never evict the channel that was just written to
+        while self.bytes > self.max_bytes and len(self.channels) > 1:
+            channel_id, ring = self.channels.popitem(last=False)
+            self.bytes -= ring.bytes
+            logger.debug(f"Evicted {ring.count} cached messages from inactive channel {channel_id}")
@@ -0,0 +1,174 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+DEFAULT_INTERVAL = 0.005
+MAX_STACK_DEPTH = 128
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Innermost frames that mean a thread is parked waiting rather than doing work: (file, function)
+IDLE_FRAMES = {
+    ('selectors.py', 'select'),
+    ('threading.py', 'wait'),
+    ('queue.py', 'get'),
+    ('thread.py', '_worker'),
+}
+
+
+
+
+# Function to give a code object a short, readable frame name for reports
+def frame_name(code):
+
+    filename = code.co_filename
+    if filename.startswith(ROOT):
+        filename = os.path.relpath(filename, ROOT)
+    else:
+        # Library frames: keep the package-relative tail, e.g. discord/client.py
+        parts = filename.replace('\\', '/').split('/')
+        filename = '/'.join(parts[-2:])
+    return f"{code.co_qualname if hasattr(code, 'co_qualname') else code.co_name} ({filename})"
+
+
+
+
+# Function to map every command callback and event listener's code object to a report label
+def handler_labels(bot):
+
+    labels = {}
+    for command in bot.walk_commands():
+        labels[command.callback.__code__] = f"command:{command.qualified_name}"
+    for cog in bot.cogs.values():
+        for event, listener in cog.get_listeners():
+            labels[listener.__code__] = f"event:{event}"
+    for event, listeners in bot.extra_events.items():
+        for listener in listeners:
+            labels[listener.__code__] = f"event:{event}"
+    return labels
+
+
+
+
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that periodically snapshots every thread's Python stack
+    It runs on its own thread for a fixed window and costs nothing when not running.
+    Each sample is attributed to the innermost command or event handler on the stack,
+    or to the thread it was taken on when no handler is involved
+    """
+
+
+
+    def __init__(self, labels=None, interval=DEFAULT_INTERVAL):
+
+        self.labels = labels or {}
+        self.interval = interval
+        self.stacks = Counter()    # (label, stack of code objects, root first) -> samples
+        self.samples = 0
+        self.elapsed = 0.0
+
+
+
+
+    # Function to sample for a number of seconds, blocks the calling thread
+    def run(self, seconds):
+
+        me = threading.get_ident()
+        main = threading.main_thread().ident
+        start = time.perf_counter()
+        deadline = start + seconds
+
+        # The sampler needs the GIL to take a sample; a shorter switch interval for the window
+        # stops short bursts of CPU work on other threads from hiding between samples
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch_interval, self.interval / 10))
+        try:
+            while time.perf_counter() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    self._record(frame, 'event-loop' if ident == main else f"thread:{names.get(ident, ident)}")
+                self.samples += 1
+                time.sleep(self.interval)
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        self.elapsed = time.perf_counter() - start
+        return self
+
+
+    def _record(self, frame, thread_label):
+
+        stack = []
+        label = None
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            stack.append(code)
+            if label is None:
+                label = self.labels.get(code)
+            frame = frame.f_back
+        stack.reverse()
+
+        # An event loop parked in select() or an executor waiting for work is idle rather than busy
+        if label is None and stack and (os.path.basename(stack[-1].co_filename), stack[-1].co_name) in IDLE_FRAMES:
+            label = f"{thread_label} (idle)"
+        self.stacks[(label or thread_label, tuple(stack))] += 1
+
+
+
+
+    # Function to render the samples in collapsed-stack format (flamegraph.pl, speedscope, inferno)
+    def collapsed(self):
+
+        lines = []
+        for (label, stack), count in sorted(self.stacks.items(), key=lambda item: item[1], reverse=True):
+            frames = ";".join(frame_name(code).replace(';', ':') for code in stack)
+            lines.append(f"{label};{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+
+
+
+    # Function to summarise the hottest handlers and functions, idle samples only count towards the handler table
+    def summary(self, top=20):
+
+        total = sum(self.stacks.values()) or 1
+        by_label = Counter()
+        self_time = Counter()
+        inclusive = Counter()
+        for (label, stack), count in self.stacks.items():
+            by_label[label] += count
+            if label.endswith(' (idle)'):
+                continue
+            if stack:
+                self_time[stack[-1]] += count
+            for code in set(stack):
+                inclusive[code] += count
+
+        lines = [
+            f"Sampled {self.samples} times over {self.elapsed:.1f}s ({self.interval * 1000:.0f}ms interval), {total} stack samples",
+            "",
+            "Samples by handler / thread:"
+        ]
+        for label, count in by_label.most_common(top):
+            lines.append(f"  {count / total:>7.2%}  {count:>7}  {label}")
+
+        lines.append("")
+        busy = sum(count for label, count in by_label.items() if not label.endswith(' (idle)'))
+        lines.append(f"Hottest functions (self), {busy} busy samples:")
+        for code, count in self_time.most_common(top):
+            lines.append(f"  {count / total:>7.2%}  {count:>7}  {frame_name(code)}")
+
+        lines.append("")
+        lines.append("Hottest functions (inclusive):")
+        for code, count in inclusive.most_common(top):
+            lines.append(f"  {count / total:>7.2%}  {count:>7}  {frame_name(code)}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+
+
+
+class SQLiteThread:
+    """
+    One SQLite connection owned by a dedicated thread
+    Every call on the connection goes through run(), so blocking database work never
+    touches the event loop and the connection is only ever used from one thread
+    """
+
+
+
+    def __init__(self, path, schema, name):
+
+        self.path = path
+        self.schema = schema
+        self.conn = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+
+
+
+    # Function to run a blocking database call on the connection's thread
+    async def run(self, func, *args):
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+
+
+
+    # Function to open the database in WAL mode and apply the schema
+    async def open(self):
+
+        await self.run(self._open)
+
+
+    def _open(self):
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.schema)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        self.conn = conn
+
+
+
+
+    # Function to close the connection and stop the thread
+    async def close(self):
+
+        if self.conn is not None:
+            await self.run(self.conn.close)
+            self.conn = None
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,93 @@
+import os
+import re
+import subprocess
+import sys
+import time
+
+
+# Taken when this module is first imported, main.py imports it before anything else
+PROCESS_START = time.perf_counter()
+
+DEFAULT_BUDGET = {
+    "import_ms": 1500,
+    "setup_hook_ms": 4000
+}
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+
+
+# Function to get milliseconds elapsed since process start
+def since_start_ms():
+
+    return (time.perf_counter() - PROCESS_START) * 1000
+
+
+
+
+"""
+Function to measure per-module import cost the same way `python -X importtime` does
+Runs the import in a fresh interpreter so nothing is already cached, and returns
+(module, self_us, cumulative_us, depth) entries in import order
+"""
+def import_profile(module='bot.bot_client'):
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        cwd=ROOT
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+
+
+# Function to summarise an import profile as a table of the most expensive packages
+def format_import_profile(entries, top=25):
+
+    total_us = sum(self_us for _, self_us, _, _ in entries)
+
+    # Roll self time up to top-level packages so 200 discord submodules read as one line
+    packages = {}
+    for name, self_us, _, _ in entries:
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+
+    lines = [f"Total import time: {total_us / 1000:.1f}ms across {len(entries)} modules", ""]
+    lines.append(f"{'package':<30} {'self ms':>10} {'share':>7}")
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        lines.append(f"{package:<30} {self_us / 1000:>10.1f} {self_us / max(1, total_us):>7.1%}")
+
+    lines.append("")
+    lines.append(f"{'slowest modules':<50} {'self ms':>10} {'cumulative ms':>14}")
+    for name, self_us, cumulative_us, _ in sorted(entries, key=lambda entry: entry[1], reverse=True)[:top]:
+        lines.append(f"{name:<50} {self_us / 1000:>10.1f} {cumulative_us / 1000:>14.1f}")
+
+    return "\n".join(lines)
+
+
+
+
+# Function to compare measured startup times with the configured budget, returns a list of failures
+def check_budget(measured, budget=None):
+
+    budget = {**DEFAULT_BUDGET, **(budget or {})}
+    failures = []
+    for key, limit in budget.items():
+        value = measured.get(key)
+        if value is not None and value > limit:
+            failures.append(f"{key} {value:.0f}ms exceeds budget of {limit}ms")
+    return failures
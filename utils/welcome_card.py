@@ -0,0 +1,216 @@
+import asyncio
+import importlib.util
+import io
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.lru import LRUCache
+
+
+logger = logging.getLogger('bot.welcome_card')
+
+
+CARD_SIZE = (800, 250)
+AVATAR_SIZE = 180
+AVATAR_FETCH_SIZE = 256
+
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+DEFAULT_WORKERS = 2
+
+
+
+
+"""
+Rendering functions
+These run inside the process pool, so they are module level, take and return plain bytes,
+and import Pillow lazily so the bot process never pays for it unless cards are enabled
+"""
+
+# Function to compose the card background from an image file, or a gradient when none is configured
+def compose_background(path=None, size=CARD_SIZE):
+
+    from PIL import Image, ImageEnhance, ImageOps
+
+    if path:
+        with Image.open(path) as image:
+            background = ImageOps.fit(image.convert('RGB'), size)
+        background = ImageEnhance.Brightness(background).enhance(0.55)
+    else:
+        top = Image.new('RGB', size, (35, 39, 42))
+        bottom = Image.new('RGB', size, (88, 101, 242))
+        mask = Image.linear_gradient('L').rotate(90).resize(size)
+        background = Image.composite(bottom, top, mask)
+
+    buffer = io.BytesIO()
+    background.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+
+
+# Function to load a font, falling back to Pillow's built-in one
+def _font(size):
+
+    from PIL import ImageFont
+
+    for name in ('DejaVuSans-Bold.ttf', 'Arial Bold.ttf', 'arialbd.ttf'):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+
+
+# Function to render a finished welcome card as PNG bytes
+def render_card(avatar_bytes, background_bytes, display_name, guild_name, member_number):
+
+    from PIL import Image, ImageDraw
+
+    card = Image.open(io.BytesIO(background_bytes)).convert('RGBA')
+    width, height = card.size
+
+    # Circular avatar with a thin ring
+    avatar = Image.open(io.BytesIO(avatar_bytes)).convert('RGBA').resize((AVATAR_SIZE, AVATAR_SIZE))
+    mask = Image.new('L', (AVATAR_SIZE, AVATAR_SIZE), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, AVATAR_SIZE, AVATAR_SIZE), fill=255)
+    x, y = 35, (height - AVATAR_SIZE) // 2
+
+    draw = ImageDraw.Draw(card)
+    draw.ellipse((x - 5, y - 5, x + AVATAR_SIZE + 5, y + AVATAR_SIZE + 5), fill=(255, 255, 255, 255))
+    card.paste(avatar, (x, y), mask)
+
+    # Text block
+    text_x = x + AVATAR_SIZE + 40
+    name = display_name if len(display_name) <= 18 else display_name[:17] + '…'
+    draw.text((text_x, 55), "WELCOME", font=_font(28), fill=(220, 221, 222, 255))
+    draw.text((text_x, 90), name, font=_font(46), fill=(255, 255, 255, 255))
+    draw.text((text_x, 160), f"Member #{member_number} of {guild_name}"[:48], font=_font(24), fill=(185, 187, 190, 255))
+
+    buffer = io.BytesIO()
+    card.convert('RGB').save(buffer, format='PNG', optimize=False)
+    return buffer.getvalue()
+
+
+
+
+
+
+class WelcomeCardRenderer:
+    """
+    Renders welcome cards off the event loop
+    Pillow work runs in a process pool; avatars and composed backgrounds are kept in a
+    size-bounded LRU cache and avatars are fetched through the bot's shared HTTP client
+    """
+
+
+
+    def __init__(self, http_client, workers=DEFAULT_WORKERS, cache_bytes=DEFAULT_CACHE_BYTES, background=None):
+
+        self.http_client = http_client
+        self.workers = workers
+        self.background = background
+        self.cache = LRUCache(cache_bytes)
+        self.pool = None
+        self._pending = {}   # cache key -> task, so a join burst downloads each avatar once
+
+
+
+
+    # Function to check Pillow is installed, without importing it here
+    @staticmethod
+    def available():
+
+        return importlib.util.find_spec('PIL') is not None
+
+
+
+
+    # Function to start the worker processes and pre-compose the background
+    async def start(self):
+
+        # Spawn rather than fork: the bot already runs database threads and signal handlers,
+        # and forked workers would also inherit a copy of every cache
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        await self._background()
+
+
+
+
+    async def _in_pool(self, func, *args):
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, func, *args)
+
+
+
+
+    # Function to fetch or compute a cached value once, sharing the work between concurrent callers
+    async def _cached(self, key, factory):
+
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+
+        async def load():
+            value = await factory()
+            self.cache.set(key, value)
+            return value
+
+        task = self._pending.get(key)
+        if task is None:
+            task = self._pending[key] = asyncio.ensure_future(load())
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(task)
+
+
+
+
+    async def _background(self):
+
+        return await self._cached(('background', self.background), lambda: self._in_pool(compose_background, self.background))
+
+
+
+
+    async def _download(self, url):
+
+        # Avatars are cached here by hash, so skip the HTTP client's own response cache
+        response = await self.http_client.get(url, use_cache=False)
+        response.raise_for_status()
+        return response.body
+
+
+
+
+    async def _avatar(self, asset):
+
+        url = asset.with_format('png').with_size(AVATAR_FETCH_SIZE).url
+        return await self._cached(('avatar', asset.key), lambda: self._download(url))
+
+
+
+
+    # Function to render a member's welcome card, returns PNG bytes
+    async def render(self, member):
+
+        avatar, background = await asyncio.gather(self._avatar(member.display_avatar), self._background())
+        return await self._in_pool(
+            render_card,
+            avatar,
+            background,
+            member.display_name,
+            member.guild.name,
+            member.guild.member_count
+        )
+
+
+
+
+    def close(self):
+
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None